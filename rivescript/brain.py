@@ -15,10 +15,47 @@ from .exceptions import (
 from . import python
 from . import inheritance as inherit_utils
 from . import utils
+import operator
 import re
 from six import text_type
 import sys
 
+# Integer operators for the <add>, <sub>, <mult> and <div> tags.
+MATH_OPS = {
+    "add":  operator.add,
+    "sub":  operator.sub,
+    "mult": operator.mul,
+    "div":  operator.floordiv,
+}
+
+# Expansions for tag shortcuts and escape codes in replies. Anything else
+# matched by RE.tag_shortcuts (a leftover {weight} tag) is removed.
+TAG_SHORTCUTS = {
+    '<person>':    '{person}<star>{/person}',
+    '<@>':         '{@<star>}',
+    '<formal>':    '{formal}<star>{/formal}',
+    '<sentence>':  '{sentence}<star>{/sentence}',
+    '<uppercase>': '{uppercase}<star>{/uppercase}',
+    '<lowercase>': '{lowercase}<star>{/lowercase}',
+    '\\s':         ' ',
+    '\\n':         '\n',
+    '\\#':         '#',
+}
+
+# Read-only stand-in for users who have no input/reply history yet.
+NO_HISTORY = {
+    "input": ("undefined",) * 9,
+    "reply": ("undefined",) * 9,
+}
+
+# Numeric comparison operators for *Condition lines.
+NUMERIC_CMP = {
+    "<":  operator.lt,
+    "<=": operator.le,
+    ">":  operator.gt,
+    ">=": operator.ge,
+}
+
 class Brain(object):
     """The Brain class controls the actual reply fetching phase for RiveScript.
 
@@ -35,6 +72,7 @@ class Brain(object):
 
         # Private variables only relevant to the reply-answering part of RiveScript.
         self._current_user = None
+        self._conditions   = {}  # Parsed *Condition lines, by their source text
 
     # Proxy functions.
     def say(self, *args, **kwargs):
@@ -43,7 +81,7 @@ class Brain(object):
         self.master._warn(*args, **kwargs)
 
     def reply(self, user, msg, errors_as_replies=True):
-        self.say("Get reply to [" + user + "] " + msg)
+        self.say("Get reply to [{}] {}", user, msg)
 
         # Store the current user in case an object macro needs it.
         self._current_user = user
@@ -88,12 +126,14 @@ class Brain(object):
         # Save their reply history.
         history = self.master.get_uservar(user, "__history__")
         if type(history) is dict:
-            oldInput = history["input"][:8]
-            history["input"] = [msg]
-            history["input"].extend(oldInput)
-            oldReply = history["reply"][:8]
-            history["reply"] = [reply]
-            history["reply"].extend(oldReply)
+            # Keep the last 9 of each in new lists, so any sequence type works
+            # and nobody holding the old lists sees them change. These stay
+            # plain lists (not deques) so the user variables can be exported
+            # as JSON.
+            for kind, latest in (("input", msg), ("reply", reply)):
+                items = [latest]
+                items.extend(history[kind][:8])
+                history[kind] = items
             self.master.set_uservar(user, "__history__", history)
 
         # Unset the current user.
@@ -127,17 +167,16 @@ class Brain(object):
         # In UTF-8 mode, only strip metacharacters and HTML brackets
         # (to protect from obvious XSS attacks).
         if self.utf8:
-            msg = re.sub(RE.utf8_meta, '', msg)
+            msg = RE.utf8_meta.sub('', msg)
             msg = re.sub(self.master.unicode_punctuation, '', msg)
 
             # For the bot's reply, also strip common punctuation.
             if botreply:
-                msg = re.sub(RE.utf8_punct, '', msg)
+                msg = RE.utf8_punct.sub('', msg)
         else:
-            # For everything else, strip all non-alphanumerics.
-            msg = utils.strip_nasties(msg)
-            msg = msg.strip() # Strip leading and trailing white space
-            msg = RE.ws.sub(" ",msg) # Replace the multiple whitespaces by single whitespace
+            # For everything else, strip all non-alphanumerics. Only spaces
+            # are left between the words, so squeezing them doesn't need a regexp.
+            msg = " ".join(utils.strip_nasties(msg).split())
         return msg
 
     def _getreply(self, user, msg, context='normal', step=0, ignore_object_errors=True):
@@ -195,6 +234,11 @@ class Brain(object):
             # it doesn't exist. Serious issue!
             raise NoDefaultRandomTopicError("no default topic 'random' was found")
 
+        # Regexps compiled for dynamic triggers during this call. User
+        # variables can't change while we're matching, so the same trigger
+        # always compiles to the same regexp here.
+        regexc = {}
+
         # Create a pointer for the matched data when we find it.
         matched        = None
         matchedTrigger = None
@@ -206,96 +250,53 @@ class Brain(object):
         # is still gonna be the same as it was the first time, causing an
         # infinite loop!
         if step == 0:
-            allTopics = [topic]
-            if topic in self.master._includes or topic in self.master._lineage:
-                # Get all the topics!
-                allTopics = inherit_utils.get_topic_tree(self.master, topic)
-
-            # Scan them all!
-            for top in allTopics:
-                self.say("Checking topic " + top + " for any %Previous's.")
-                if top in self.master._sorted["thats"] and self.master._sorted["thats"][top]:
-                    self.say("There is a %Previous in this topic!")
-
-                    # Do we have history yet?
-                    lastReply = history["reply"][0]
-
-                    # Format the bot's last reply the same way as the human's.
-                    lastReply = self.format_message(lastReply, botreply=True)
-                    self.say("lastReply: " + lastReply)
-
-                    # See if it's a match.
-                    for trig in self.master._sorted["thats"][top]:
-                        pattern = trig[1]["previous"]
-                        botside = self.reply_regexp(user, pattern)
-                        self.say("Try to match lastReply ({}) to {} ({})".format(lastReply, pattern, repr(botside)))
-
-                        # Match??
-                        match = re.match(botside, lastReply)
-                        if match:
-                            # Huzzah! See if OUR message is right too.
-                            self.say("Bot side matched!")
-                            thatstars = match.groups()
-
-                            # Compare the triggers to the user's message.
-                            user_side = trig[1]
-                            subtrig = self.reply_regexp(user, user_side["trigger"])
-                            self.say("Now try to match " + msg + " to " + user_side["trigger"])
-
-                            match = re.match(subtrig, msg)
-                            if match:
-                                self.say("Found a match!")
-                                matched = trig[1]
-                                matchedTrigger = user_side["trigger"]
-                                foundMatch = True
-
-                                # Get the stars!
-                                stars = match.groups()
-                                break
-
-                        # Break if we found a match.
-                        if foundMatch:
-                            break
-                # Break if we found a match.
-                if foundMatch:
-                    break
+            previous = self.match_previous(user, topic, msg, history, regexc)
+            if previous is not None:
+                matched, stars, thatstars = previous
+                matchedTrigger = matched["trigger"]
+                foundMatch = True
 
         # Search their topic for a match to their trigger.
         if not foundMatch:
-            for trig in self.master._sorted["topics"][topic]:
-                pattern = trig[0]
-
-                # Process the triggers.
-                regexp = self.reply_regexp(user, pattern)
-                self.say("Try to match %r against %r (%r)" % (msg, pattern, regexp.pattern))
-
-                # Python's regular expression engine is slow. Try a verbatim
-                # match if this is an atomic trigger.
-                isAtomic = utils.is_atomic(pattern)
-                isMatch = False
-                if isAtomic:
-                    # Only look for exact matches, no sense running atomic triggers
-                    # through the regexp engine.
-                    if msg == pattern:
-                        isMatch = True
-                else:
-                    # Non-atomic triggers always need the regexp.
-                    match = re.match(regexp, msg)
-                    if match:
-                        # The regexp matched!
-                        isMatch = True
-
-                        # Collect the stars.
-                        stars = match.groups()
+            # Python's regular expression engine is slow. Triggers that only
+            # match one string are found with a dict lookup instead, so only
+            # the triggers sorted ahead of that one need the regexp.
+            literals, dynamic = self.trigger_index(topic)
+            literal = literals.get(msg)
+            if literal is not None:
+                self.say("Literal trigger {!r} matches, at position {}", literal[1][0], literal[0])
+
+            # Look these up once rather than for every trigger.
+            say          = self.say
+            reply_regexp = self.reply_regexp
+
+            for position, trig in dynamic:
+                if literal is not None and position > literal[0]:
+                    break
 
-                if isMatch:
+                pattern = trig[0]
+                regexp = reply_regexp(user, pattern, regexc)
+                say("Try to match {!r} against {!r} ({!r})", msg, pattern, regexp.pattern)
+                match = regexp.match(msg)
+                if match:
+                    # The regexp matched!
                     self.say("Found a match!")
 
                     matched = trig[1]
                     foundMatch = True
                     matchedTrigger = pattern
+
+                    # Collect the stars.
+                    stars = match.groups()
                     break
 
+            if not foundMatch and literal is not None:
+                self.say("Found a match!")
+                trig = literal[1]
+                matched = trig[1]
+                foundMatch = True
+                matchedTrigger = trig[0]
+
         # Store what trigger they matched on. If their matched trigger is None,
         # this will be too, which is great.
         self.master.set_uservar(user, "__lastmatch__", matchedTrigger)
@@ -304,89 +305,60 @@ class Brain(object):
             for nil in [1]:
                 # See if there are any hard redirects.
                 if matched["redirect"]:
-                    self.say("Redirecting us to " + matched["redirect"])
+                    self.say("Redirecting us to {}", matched["redirect"])
                     redirect = self.process_tags(user, msg, matched["redirect"], stars, thatstars, step,
                                                   ignore_object_errors)
                     redirect = redirect.lower()
-                    self.say("Pretend user said: " + redirect)
+                    self.say("Pretend user said: {}", redirect)
                     reply = self._getreply(user, redirect, step=(step + 1), ignore_object_errors=ignore_object_errors)
                     break
 
                 # Check the conditionals.
                 for con in matched["condition"]:
-                    halves = re.split(RE.cond_split, con)
-                    if halves and len(halves) == 2:
-                        condition = re.match(RE.cond_parse, halves[0])
-                        if condition:
-                            left     = condition.group(1)
-                            eq       = condition.group(2)
-                            right    = condition.group(3)
-                            potreply = halves[1]
-                            self.say("Left: " + left + "; eq: " + eq + "; right: " + right + " => " + potreply)
-
-                            # Process tags all around.
-                            left  = self.process_tags(user, msg, left, stars, thatstars, step, ignore_object_errors)
-                            right = self.process_tags(user, msg, right, stars, thatstars, step, ignore_object_errors)
-
-                            # Defaults?
-                            if len(left) == 0:
-                                left = 'undefined'
-                            if len(right) == 0:
-                                right = 'undefined'
-
-                            self.say("Check if " + left + " " + eq + " " + right)
-
-                            # Validate it.
-                            passed = False
-                            if eq == 'eq' or eq == '==':
-                                if left == right:
-                                    passed = True
-                            elif eq == 'ne' or eq == '!=' or eq == '<>':
-                                if left != right:
-                                    passed = True
-                            else:
-                                # Gasp, dealing with numbers here...
-                                try:
-                                    left, right = int(left), int(right)
-                                    if eq == '<':
-                                        if left < right:
-                                            passed = True
-                                    elif eq == '<=':
-                                        if left <= right:
-                                            passed = True
-                                    elif eq == '>':
-                                        if left > right:
-                                            passed = True
-                                    elif eq == '>=':
-                                        if left >= right:
-                                            passed = True
-                                except:
-                                    self.warn("Failed to evaluate numeric condition!")
-
-                            # How truthful?
-                            if passed:
-                                reply = potreply
-                                break
+                    condition = self.parse_condition(con)
+                    if condition:
+                        left, eq, right, potreply = condition
+                        self.say("Left: {}; eq: {}; right: {} => {}", left, eq, right, potreply)
+
+                        # Process tags all around.
+                        left  = self.process_tags(user, msg, left, stars, thatstars, step, ignore_object_errors)
+                        right = self.process_tags(user, msg, right, stars, thatstars, step, ignore_object_errors)
+
+                        # Defaults?
+                        if len(left) == 0:
+                            left = 'undefined'
+                        if len(right) == 0:
+                            right = 'undefined'
+
+                        self.say("Check if {} {} {}", left, eq, right)
+
+                        # Validate it.
+                        passed = False
+                        if eq == 'eq' or eq == '==':
+                            passed = left == right
+                        elif eq == 'ne' or eq == '!=' or eq == '<>':
+                            passed = left != right
+                        else:
+                            # Gasp, dealing with numbers here...
+                            try:
+                                passed = NUMERIC_CMP[eq](int(left), int(right))
+                            except:
+                                self.warn("Failed to evaluate numeric condition!")
+
+                        # How truthful?
+                        if passed:
+                            reply = potreply
+                            break
 
                 # Have our reply yet?
                 if len(reply) > 0:
                     break
 
                 # Process weights in the replies.
-                bucket = []
-                for text in matched["reply"]:
-                    weight = 1
-                    match  = re.search(RE.weight, text)
-                    if match:
-                        weight = int(match.group(1))
-                        if weight <= 0:
-                            self.warn("Can't have a weight <= 0!")
-                            weight = 1
-                    for i in range(0, weight):
-                        bucket.append(text)
+                weights = self.reply_weights(matched["reply"])
 
                 # Get a random reply.
-                reply = utils.random_choice(bucket)
+                reply = utils.weighted_choice(matched["reply"], weights)
                 break
 
         # Still no reply?
@@ -395,62 +367,209 @@ class Brain(object):
         elif len(reply) == 0:
             raise NoReplyError
 
-        self.say("Reply: " + reply)
+        self.say("Reply: {}", reply)
 
         # Process tags for the BEGIN block.
         if context == "begin":
             # BEGIN blocks can only set topics and uservars. The rest happen
             # later!
-            reTopic = re.findall(RE.topic_tag, reply)
-            for match in reTopic:
-                self.say("Setting user's topic to " + match)
-                self.master.set_uservar(user, "topic", match)
-                reply = reply.replace('{{topic={match}}}'.format(match=match), '')
-
-            reSet = re.findall(RE.set_tag, reply)
-            for match in reSet:
-                self.say("Set uservar " + str(match[0]) + "=" + str(match[1]))
-                self.master.set_uservar(user, match[0], match[1])
-                reply = reply.replace('<set {key}={value}>'.format(key=match[0], value=match[1]), '')
+            # Each tag is applied and removed in the same regexp pass.
+            def set_topic(match):
+                self.say("Setting user's topic to {}", match.group(1))
+                self.master.set_uservar(user, "topic", match.group(1))
+                return ''
+
+            def set_uservar(match):
+                self.say("Set uservar {}={}", match.group(1), match.group(2))
+                self.master.set_uservar(user, match.group(1), match.group(2))
+                return ''
+
+            reply = RE.topic_tag.sub(set_topic, reply)
+            reply = RE.set_tag.sub(set_uservar, reply)
         else:
             # Process more tags if not in BEGIN.
             reply = self.process_tags(user, msg, reply, stars, thatstars, step, ignore_object_errors)
 
         return reply
 
-    def reply_regexp(self, user, regexp):
+    def parse_condition(self, con):
+        """Split a ``*Condition`` line into its parts.
+
+        Conditions never change once they're loaded, so the result is cached
+        by the condition's text.
+
+        :param str con: The condition, e.g. ``<get age> > 18 => Welcome.``
+
+        :return tuple: ``(left, eq, right, reply)``, or ``None`` if the
+            condition isn't well formed.
+        """
+        if con in self._conditions:
+            return self._conditions[con]
+
+        parsed = None
+        halves = RE.cond_split.split(con)
+        if halves and len(halves) == 2:
+            condition = RE.cond_parse.match(halves[0])
+            if condition:
+                parsed = condition.groups() + (halves[1],)
+
+        self._conditions[con] = parsed
+        return parsed
+
+    def match_previous(self, user, topic, msg, history, cache=None):
+        """Find the %Previous trigger that matches the user's message.
+
+        :param str user: The user ID.
+        :param str topic: The user's topic.
+        :param str msg: The formatted message from the user.
+        :param dict history: The user's input and reply history.
+        :param dict cache: The regexp cache for ``reply_regexp()``.
+
+        :return tuple: The matched trigger data, the user's stars and the
+            bot's stars from its last reply; or ``None`` if nothing matched.
+        """
+        # Get all the topics that have any %Previous's.
+        thatTopics = inherit_utils.get_previous_topics(self.master, topic)
+        if not thatTopics:
+            return None
+
+        # Format the bot's last reply the same way as the human's.
+        lastReply = self.format_message(history["reply"][0], botreply=True)
+        self.say("lastReply: {}", lastReply)
+
+        # Scan them all!
+        for top in thatTopics:
+            self.say("Checking %Previous's in topic {}.", top)
+
+            # See if it's a match.
+            for trig in self.master._sorted["thats"][top]:
+                pattern = trig[1]["previous"]
+                botside = self.reply_regexp(user, pattern, cache)
+                self.say("Try to match lastReply ({}) to {} ({!r})", lastReply, pattern, botside)
+
+                # Match??
+                match = botside.match(lastReply)
+                if not match:
+                    continue
+
+                # Huzzah! See if OUR message is right too.
+                self.say("Bot side matched!")
+                thatstars = match.groups()
+
+                # Compare the triggers to the user's message.
+                user_side = trig[1]
+                subtrig = self.reply_regexp(user, user_side["trigger"], cache)
+                self.say("Now try to match {} to {}", msg, user_side["trigger"])
+
+                match = subtrig.match(msg)
+                if match:
+                    self.say("Found a match!")
+                    return user_side, match.groups(), thatstars
+
+        return None
+
+    def reply_weights(self, replies):
+        """Get the ``{weight}`` of each of a trigger's replies.
+
+        This is cached in ``_topic_cache`` until the replies are sorted again.
+
+        :param list replies: The replies of a trigger.
+
+        :return list: The weight of each reply.
+        """
+        cache = self.master._topic_cache["weights"]
+        key = tuple(replies)
+        weights = cache.get(key)
+        if weights is None:
+            weights = []
+            for text in replies:
+                weight = 1
+                match  = RE.weight.search(text)
+                if match:
+                    weight = int(match.group(1))
+                    if weight <= 0:
+                        self.warn("Can't have a weight <= 0!")
+                        weight = 1
+                weights.append(weight)
+            cache[key] = weights
+        return weights
+
+    def trigger_index(self, topic):
+        """Split a topic's sorted triggers by how they need to be matched.
+
+        This is cached in ``_topic_cache`` until the replies are sorted again.
+
+        :param str topic: The topic name.
+
+        :return tuple: A dict mapping the text of each trigger that only
+            matches that exact text to its ``(position, trigger)`` in the sort
+            buffer (the first one, if there are several), and a list of
+            ``(position, trigger)`` for the triggers that need a regexp.
+        """
+        cache = self.master._topic_cache["index"]
+        if topic not in cache:
+            literals = {}
+            dynamic  = []
+            for position, trig in enumerate(self.master._sorted["topics"][topic]):
+                literal = utils.literal_text(trig[0])
+                if literal is None:
+                    dynamic.append((position, trig))
+                elif literal not in literals:
+                    literals[literal] = (position, trig)
+            cache[topic] = (literals, dynamic)
+        return cache[topic]
+
+    def reply_regexp(self, user, regexp, cache=None):
         """Prepares a trigger for the regular expression engine.
 
         :param str user: The user ID invoking a reply.
         :param str regexp: The original trigger text to be turned into a regexp.
+        :param dict cache: An optional dict to memoize the compiled regexps of
+            dynamic triggers in, for as long as the user's variables can't
+            change (e.g. for the duration of a single ``_getreply()``).
 
         :return regexp: The final regexp object."""
 
-        if regexp in self.master._regexc["trigger"]:
+        regexc = self.master._regexc
+        compiled = regexc["trigger"].get(regexp)
+        if compiled is not None:
             # Already compiled this one!
-            return self.master._regexc["trigger"][regexp]
+            return compiled
+
+        # Triggers whose only dynamic parts are arrays look the same for every
+        # user, until the arrays are reloaded.
+        compiled = regexc["array_trigger"].get(regexp)
+        if compiled is not None:
+            return compiled
+
+        if cache is not None and regexp in cache:
+            return cache[regexp]
+        trigger = regexp
 
         # If the trigger is simply '*' then the * there needs to become (.*?)
         # to match the blank string too.
-        regexp = re.sub(RE.zero_star, r'<zerowidthstar>', regexp)
+        regexp = RE.zero_star.sub(r'<zerowidthstar>', regexp)
 
         # Filter in arrays.
-        arrays = re.findall(RE.array, regexp)
+        arrays = RE.array.findall(regexp)
         for array in arrays:
             rep = ''
             if array in self.master._array:
-                rep = r'(?:' + '|'.join(self.expand_array(array)) + ')'
+                rep = regexc["array"].get(array)
+                if rep is None:
+                    rep = r'(?:' + '|'.join(self.expand_array(array)) + ')'
+                    regexc["array"][array] = rep
             regexp = re.sub(r'\@' + re.escape(array) + r'\b', rep, regexp)
 
         # Simple replacements.
         regexp = regexp.replace('*', '(.+?)')   # Convert * into (.+?)
         regexp = regexp.replace('#', '(\d+?)')  # Convert # into (\d+?)
         regexp = regexp.replace('_', '(\w+?)')  # Convert _ into (\w+?)
-        regexp = re.sub(RE.weight, '', regexp)  # Remove {weight} tags, allow spaces before the bracket
+        regexp = RE.weight.sub('', regexp)  # Remove {weight} tags, allow spaces before the bracket
         regexp = regexp.replace('<zerowidthstar>', r'(.*?)')
 
         # Optionals.
-        optionals = re.findall(RE.optionals, regexp)
+        optionals = RE.optionals.findall(regexp)
         for match in optionals:
             parts = match.split("|")
             new = []
@@ -469,10 +588,10 @@ class Brain(object):
                 '(?:' + pipes + r'|(?:\\s|\\b))', regexp)
 
         # _ wildcards can't match numbers!
-        regexp = re.sub(RE.literal_w, r'[^\\s\\d]', regexp)
+        regexp = RE.literal_w.sub(r'[^\\s\\d]', regexp)
 
         # Filter in bot variables.
-        bvars = re.findall(RE.bot_tag, regexp)
+        bvars = RE.bot_tag.findall(regexp)
         for var in bvars:
             rep = ''
             if var in self.master._var:
@@ -480,7 +599,7 @@ class Brain(object):
             regexp = regexp.replace('<bot {var}>'.format(var=var), rep)
 
         # Filter in user variables.
-        uvars = re.findall(RE.get_tag, regexp)
+        uvars = RE.get_tag.findall(regexp)
         for var in uvars:
             rep = ''
             value = self.master.get_uservar(user, var)
@@ -492,6 +611,8 @@ class Brain(object):
         # do it if we have to!
         if '<input' in regexp or '<reply' in regexp:
             history = self.master.get_uservar(user, "__history__")
+            if not isinstance(history, dict):
+                history = NO_HISTORY
             for type in ['input', 'reply']:
                 tags = re.findall(r'<' + type + r'([0-9])>', regexp)
                 for index in tags:
@@ -502,9 +623,15 @@ class Brain(object):
                 # TODO: the Perl version doesn't do just <input>/<reply> in trigs!
 
         if self.utf8:
-            return re.compile(r'^' + regexp.lower() + r'$', re.UNICODE)
+            compiled = re.compile(r'^' + regexp.lower() + r'$', re.UNICODE)
         else:
-            return re.compile(r'^' + regexp.lower() + r'$')
+            compiled = re.compile(r'^' + regexp.lower() + r'$')
+
+        if arrays and not any(tag in trigger for tag in ("<bot", "<get", "<input", "<reply")):
+            regexc["array_trigger"][trigger] = compiled
+        elif cache is not None:
+            cache[trigger] = compiled
+        return compiled
 
     def do_expand_array(self, array_name, depth=0):
         """Do recurrent array expansion, returning a set of keywords.
@@ -569,7 +696,7 @@ class Brain(object):
         if len(botstars) == 1:
             botstars.append("undefined")
 
-        matcher = re.findall(RE.reply_array, reply)
+        matcher = RE.reply_array.findall(reply)
         for match in matcher:
             name = match
             if name in self.master._array:
@@ -577,65 +704,58 @@ class Brain(object):
             else:
                 result = "\x00@" + name + "\x00"
             reply = reply.replace("(@"+name+")", result)
-        reply = re.sub(RE.ph_array, r'(@\1)', reply)
-
-        # Tag shortcuts.
-        reply = reply.replace('<person>', '{person}<star>{/person}')
-        reply = reply.replace('<@>', '{@<star>}')
-        reply = reply.replace('<formal>', '{formal}<star>{/formal}')
-        reply = reply.replace('<sentence>', '{sentence}<star>{/sentence}')
-        reply = reply.replace('<uppercase>', '{uppercase}<star>{/uppercase}')
-        reply = reply.replace('<lowercase>', '{lowercase}<star>{/lowercase}')
-
-        # Weight and <star> tags.
-        reply = re.sub(RE.weight, '', reply)  # Leftover {weight}s
+        reply = RE.ph_array.sub(r'(@\1)', reply)
+
+        # Tag shortcuts, escape codes and leftover {weight}s, in one pass.
+        # Plain text replies can't contain any of them.
+        if '<' in reply or '\\' in reply or '{' in reply:
+            reply = RE.tag_shortcuts.sub(lambda m: TAG_SHORTCUTS.get(m.group(0), ''), reply)
+
+        # <star> tags.
         if len(stars) > 0:
             reply = reply.replace('<star>', text_type(stars[1]))
-            reStars = re.findall(RE.star_tags, reply)
+            reStars = set(RE.star_tags.findall(reply))
             for match in reStars:
                 if int(match) < len(stars):
-                    reply = reply.replace('<star{match}>'.format(match=match), text_type(stars[int(match)]))
+                    reply = reply.replace('<star' + match + '>', text_type(stars[int(match)]))
         if len(botstars) > 0:
             reply = reply.replace('<botstar>', botstars[1])
-            reStars = re.findall(RE.botstars, reply)
+            reStars = set(RE.botstars.findall(reply))
             for match in reStars:
                 if int(match) < len(botstars):
-                    reply = reply.replace('<botstar{match}>'.format(match=match), text_type(botstars[int(match)]))
+                    reply = reply.replace('<botstar' + match + '>', text_type(botstars[int(match)]))
 
         # <input> and <reply>
         history = self.master.get_uservar(user, "__history__")
         if type(history) is not dict:
-            history = self.default_history()
+            history = NO_HISTORY
         reply = reply.replace('<input>', history['input'][0])
         reply = reply.replace('<reply>', history['reply'][0])
-        reInput = re.findall(RE.input_tags, reply)
+        reInput = set(RE.input_tags.findall(reply))
         for match in reInput:
-            reply = reply.replace('<input{match}>'.format(match=match),
-                                  history['input'][int(match) - 1])
-        reReply = re.findall(RE.reply_tags, reply)
+            reply = reply.replace('<input' + match + '>', history['input'][int(match) - 1])
+        reReply = set(RE.reply_tags.findall(reply))
         for match in reReply:
-            reply = reply.replace('<reply{match}>'.format(match=match),
-                                  history['reply'][int(match) - 1])
+            reply = reply.replace('<reply' + match + '>', history['reply'][int(match) - 1])
 
-        # <id> and escape codes.
+        # <id>
         reply = reply.replace('<id>', user)
-        reply = reply.replace('\\s', ' ')
-        reply = reply.replace('\\n', "\n")
-        reply = reply.replace('\\#', '#')
 
         # Random bits.
-        reRandom = re.findall(RE.random_tags, reply)
+        reRandom = RE.random_tags.findall(reply)
         for match in reRandom:
             output = ''
             if '|' in match:
                 output = utils.random_choice(match.split('|'))
             else:
                 output = utils.random_choice(match.split(' '))
-            reply = reply.replace('{{random}}{match}{{/random}}'.format(match=match), output, 1) # Replace 1st match
+            reply = reply.replace('{random}' + match + '{/random}', output, 1) # Replace 1st match
 
         # Person Substitutions and String Formatting.
         for item in ['person', 'formal', 'sentence', 'uppercase',  'lowercase']:
-            matcher = re.findall(r'\{' + item + r'\}(.+?)\{/' + item + r'\}', reply)
+            if '{' + item + '}' not in reply:
+                continue
+            matcher = RE.format_tags[item].findall(reply)
             for match in matcher:
                 output = None
                 if item == 'person':
@@ -643,83 +763,14 @@ class Brain(object):
                     output = self.substitute(match, "person")
                 else:
                     output = utils.string_format(match, item)
-                reply = reply.replace('{{{item}}}{match}{{/{item}}}'.format(item=item, match=match), output)
+                reply = reply.replace('{' + item + '}' + match + '{/' + item + '}', output)
 
-        # Handle all variable-related tags with an iterative regex approach,
-        # to allow for nesting of tags in arbitrary ways (think <set a=<get b>>)
-        # Dummy out the <call> tags first, because we don't handle them right
-        # here.
+        # Handle all variable-related tags, allowing for nesting of tags in
+        # arbitrary ways (think <set a=<get b>>). Dummy out the <call> tags
+        # first, because we don't handle them right here.
         reply = reply.replace("<call>", "{__call__}")
         reply = reply.replace("</call>", "{/__call__}")
-        while True:
-            # This regex will match a <tag> which contains no other tag inside
-            # it, i.e. in the case of <set a=<get b>> it will match <get b> but
-            # not the <set> tag, on the first pass. The second pass will get the
-            # <set> tag, and so on.
-            match = re.search(RE.tag_search, reply)
-            if not match: break  # No remaining tags!
-
-            match = match.group(1)
-            parts  = match.split(" ", 1)
-            tag    = parts[0].lower()
-            data   = parts[1] if len(parts) > 1 else ""
-            insert = ""  # Result of the tag evaluation
-
-            # Handle the tags.
-            if tag == "bot" or tag == "env":
-                # <bot> and <env> tags are similar.
-                target = self.master._var if tag == "bot" else self.master._global
-                if "=" in data:
-                    # Setting a bot/env variable.
-                    parts = data.split("=")
-                    self.say("Set " + tag + " variable " + text_type(parts[0]) + "=" + text_type(parts[1]))
-                    target[parts[0]] = parts[1]
-                else:
-                    # Getting a bot/env variable.
-                    insert = target.get(data, "undefined")
-            elif tag == "set":
-                # <set> user vars.
-                parts = data.split("=")
-                self.say("Set uservar " + text_type(parts[0]) + "=" + text_type(parts[1]))
-                self.master.set_uservar(user, parts[0], parts[1])
-            elif tag in ["add", "sub", "mult", "div"]:
-                # Math operator tags.
-                parts = data.split("=")
-                var   = parts[0]
-                value = parts[1]
-                curv  = self.master.get_uservar(user, var)
-
-                # Sanity check the value.
-                try:
-                    value = int(value)
-                    if curv in [None, "undefined"]:
-                        # Initialize it.
-                        curv = 0
-                except:
-                    insert = "[ERR: Math can't '{}' non-numeric value '{}']".format(tag, value)
-
-                # Attempt the operation.
-                try:
-                    orig = int(curv)
-                    new  = 0
-                    if tag == "add":
-                        new = orig + value
-                    elif tag == "sub":
-                        new = orig - value
-                    elif tag == "mult":
-                        new = orig * value
-                    elif tag == "div":
-                        new = orig // value
-                    self.master.set_uservar(user, var, new)
-                except:
-                    insert = "[ERR: Math couldn't '{}' to value '{}']".format(tag, curv)
-            elif tag == "get":
-                insert = self.master.get_uservar(user, data)
-            else:
-                # Unrecognized tag.
-                insert = "\x00{}\x01".format(match)
-
-            reply = reply.replace("<{}>".format(match), text_type(insert))
+        reply = self.resolve_tags(user, reply)
 
         # Restore unrecognized tags.
         reply = reply.replace("\x00", "<").replace("\x01", ">")
@@ -728,27 +779,28 @@ class Brain(object):
         if '{!' in reply:
             self._warn("Use of the {!...} tag is deprecated and not supported here.")
 
-        # Topic setter.
-        reTopic = re.findall(RE.topic_tag, reply)
-        for match in reTopic:
-            self.say("Setting user's topic to " + match)
-            self.master.set_uservar(user, "topic", match)
-            reply = reply.replace('{{topic={match}}}'.format(match=match), '')
+        # Topic setter. Each tag is applied and removed in the same regexp pass.
+        def set_topic(match):
+            self.say("Setting user's topic to {}", match.group(1))
+            self.master.set_uservar(user, "topic", match.group(1))
+            return ''
+
+        reply = RE.topic_tag.sub(set_topic, reply)
 
         # Inline redirecter.
-        reRedir = re.findall(RE.redir_tag, reply)
+        reRedir = RE.redir_tag.findall(reply)
         for match in reRedir:
             self.say("Redirect to " + match)
             at = match.strip()
             subreply = self._getreply(user, at, step=(depth + 1))
-            reply = reply.replace('{{@{match}}}'.format(match=match), subreply)
+            reply = reply.replace('{@' + match + '}', subreply)
 
         # Object caller.
         reply = reply.replace("{__call__}", "<call>")
         reply = reply.replace("{/__call__}", "</call>")
-        reCall = re.findall(r'<call>(.+?)</call>', reply)
+        reCall = RE.call_tag.findall(reply)
         for match in reCall:
-            parts  = re.split(RE.ws, match)
+            parts  = RE.ws.split(match)
             output = ''
             obj    = parts[0]
             args   = []
@@ -777,10 +829,120 @@ class Brain(object):
                     raise ObjectError(RS_ERR_OBJECT_MISSING)
                 output = RS_ERR_OBJECT_MISSING
 
-            reply = reply.replace('<call>{match}</call>'.format(match=match), output)
+            reply = reply.replace('<call>' + match + '</call>', output)
 
         return reply
 
+    def resolve_tags(self, user, reply):
+        """Evaluate the variable-related tags in a reply.
+
+        This scans the reply once from left to right, keeping a stack of the
+        ``<`` brackets that haven't been closed yet. A ``>`` closes the most
+        recent one, so in the case of ``<set a=<get b>>`` the ``<get b>`` tag
+        is evaluated first, and then the ``<set>`` tag around its result.
+
+        The result of each tag is pushed back onto the unscanned input, so
+        tags inside of it are evaluated too, and identical tags still waiting
+        to be scanned share the same result.
+
+        :param str user: The user ID.
+        :param str reply: The reply text.
+
+        :return str: The reply with its tags evaluated.
+        """
+        output = []  # Fragments of resolved text
+        opened = []  # Indexes in ``output`` of the unclosed '<' brackets
+        pos    = 0
+
+        while True:
+            match = RE.tag_bracket.search(reply, pos)
+            if not match:
+                output.append(reply[pos:])
+                break
+
+            end = match.start()
+            output.append(reply[pos:end])
+            pos = end + 1
+
+            if reply[end] == "<":
+                opened.append(len(output))
+                output.append("<")
+                continue
+
+            # A '>' closes the innermost open tag, if it has any contents.
+            tag = "".join(output[opened[-1] + 1:]) if opened else ""
+            if not tag:
+                output.append(">")
+                continue
+
+            del output[opened.pop():]
+            insert = text_type(self.eval_tag(user, tag))
+            reply  = insert + reply[pos:].replace("<" + tag + ">", insert)
+            pos    = 0
+
+        return "".join(output)
+
+    def eval_tag(self, user, match):
+        """Evaluate a single variable-related tag.
+
+        :param str user: The user ID.
+        :param str match: The contents of the tag, without its brackets,
+            e.g. ``set name=Alice``.
+
+        :return: The text to insert in place of the tag.
+        """
+        parts  = match.split(" ", 1)
+        tag    = parts[0].lower()
+        data   = parts[1] if len(parts) > 1 else ""
+        insert = ""  # Result of the tag evaluation
+
+        # Handle the tags.
+        if tag == "bot" or tag == "env":
+            # <bot> and <env> tags are similar.
+            target = self.master._var if tag == "bot" else self.master._global
+            if "=" in data:
+                # Setting a bot/env variable.
+                parts = data.split("=")
+                self.say("Set " + tag + " variable " + text_type(parts[0]) + "=" + text_type(parts[1]))
+                target[parts[0]] = parts[1]
+            else:
+                # Getting a bot/env variable.
+                insert = target.get(data, "undefined")
+        elif tag == "set":
+            # <set> user vars.
+            parts = data.split("=")
+            self.say("Set uservar " + text_type(parts[0]) + "=" + text_type(parts[1]))
+            self.master.set_uservar(user, parts[0], parts[1])
+        elif tag in MATH_OPS:
+            # Math operator tags.
+            parts = data.split("=")
+            var   = parts[0]
+            value = parts[1]
+            curv  = self.master.get_uservar(user, var)
+
+            # Sanity check the value.
+            try:
+                value = int(value)
+                if curv in [None, "undefined"]:
+                    # Initialize it.
+                    curv = 0
+            except:
+                insert = "[ERR: Math can't '{}' non-numeric value '{}']".format(tag, value)
+
+            # Attempt the operation.
+            try:
+                new = MATH_OPS[tag](int(curv), value)
+                self.master.set_uservar(user, var, new)
+            except:
+                insert = "[ERR: Math couldn't '{}' to value '{}']".format(tag, curv)
+        elif tag == "get":
+            insert = self.master.get_uservar(user, data)
+        else:
+            # Unrecognized tag.
+            insert = "\x00{}\x01".format(match)
+
+        return insert
+
     def substitute(self, msg, kind):
         """Run a kind of substitution on a message.
 
@@ -790,64 +952,53 @@ class Brain(object):
         """
 
         # Per the profiler, with a large base of rules and especially substitutions, 80% of the time
-        # in the rivescript interpreter is spent here, so we optimize the heck out of this
-        # routine, to get us a 5x+ improvement over the prior version
+        # in the rivescript interpreter is spent here. The regexps are built by sort_replies(), and
+        # one regexp pass tells whether any of the patterns are in the message at all.
+        if "lists" not in self.master._sorted:
+            raise RepliesNotSortedError("You must call sort_replies() once you are done loading RiveScript documents")
+
+        compiled = self.master._regexc[kind]
+        if compiled is None:
+            return msg.strip()
+        find_any, patterns = compiled
+        if find_any.search(msg) is None:
+            return msg.strip()
 
         subs = self.master._sub
         if kind[0] == 'p':
             subs = self.master._person
 
-        # Make placeholders each time we substitute something.
-        ph = []
-        i  = 0
-        possibly_found_one = False
-        try:
-            smrk = self.master._regexc[kind]
-
-            for pattern in self.master._sorted["lists"][kind]:
-                result = subs[pattern]
-
-                # Make a placeholder.
-                ph.append(result)
-                placeholder = "\x00%d\x00" % i
-                i += 1
-
-                cache = smrk[pattern]
-                if msg == pattern:
-                    msg = placeholder
-                    possibly_found_one = True
-                if msg.startswith(pattern):
-                    msg = re.sub(cache["sub2"], placeholder + r'\1', msg)
-                    possibly_found_one = True
-                if pattern in msg:
-                    msg0 = msg
-                    while True:
-                        msg = re.sub(cache["sub3"], r'\1' + placeholder + r'\2', msg0)
-                        if msg == msg0:
-                            break
-                        else:
-                            possibly_found_one = True
-                        msg0 = msg
-                if msg.endswith(pattern):
-                    msg = re.sub(cache["sub4"], r'\1' + placeholder, msg)
-                    possibly_found_one = True
-
-            if not possibly_found_one:
-                return msg.strip()
-
-            placeholders = re.findall(RE.placeholder, msg)
-            for match in placeholders:
-                i = int(match)
-                result = ph[i]
-                msg = msg.replace('\x00' + match + '\x00', result)
-
-            # Strip & return.
-            return msg.strip()
-        except KeyError:
-            raise RepliesNotSortedError("You must call sort_replies() once you are done loading RiveScript documents")
+        # Apply the patterns in priority order. The message is kept as a list
+        # alternating between original text (even indexes) and substituted
+        # text (odd indexes), so nothing is ever substituted twice. The edges
+        # of each piece of original text count as word boundaries. Each piece
+        # is part of the original message, so only the patterns found in the
+        # whole message need to be looked for.
+        pieces = [msg]
+        for pattern, regexp in [item for item in patterns if item[0] in msg]:
+            result = subs.get(pattern)
+            if result is None:
+                continue
+
+            new = []
+            for i, piece in enumerate(pieces):
+                if i % 2 or pattern not in piece:
+                    new.append(piece)
+                    continue
+                match = regexp.search(piece)
+                while match is not None:
+                    new.append(piece[:match.start()])
+                    new.append(result)
+                    piece = piece[match.end():]
+                    match = regexp.search(piece)
+                new.append(piece)
+            pieces = new
+
+        # Strip & return.
+        return "".join(pieces).strip()
 
     def default_history(self):
         return {
-            "input": ["undefined"] * 9,
-            "reply": ["undefined"] * 9,
+            "input": list(NO_HISTORY["input"]),
+            "reply": list(NO_HISTORY["reply"]),
         }
@@ -5,8 +5,16 @@
 #
 # https://www.rivescript.com/
 
+from .regexp import RE
+import sys
+
 def get_topic_triggers(rs, topic, thats, depth=0, inheritance=0, inherited=False):
-    """Recursively scan a topic and return a list of all triggers.
+    """Scan a topic and the topics it reaches and return a list of all triggers.
+
+    Results are cached in ``rs._topic_cache`` until the topic structure
+    changes, so shared topics in an inheritance graph are only scanned once.
+    Each call still returns fresh ``[trigger, data]`` lists, because the
+    sorter rewrites the trigger text in place.
 
     Arguments:
         rs (RiveScript): A reference to the parent RiveScript instance.
@@ -20,11 +28,55 @@ def get_topic_triggers(rs, topic, thats, depth=0, inheritance=0, inherited=False
     Returns:
         []str: List of all triggers found.
     """
+    key = (topic, thats, inheritance, inherited)
+    cache = rs._topic_cache["triggers"]
+    if key not in cache:
+        _collect_topic_triggers(rs, key, depth)
+        if depth == 0:
+            cache[key] = tuple(_unique_triggers(cache[key]))
+    return [list(trigger) for trigger in cache[key]]
+
+def _unique_triggers(triggers):
+    """Drop the triggers that a topic tree reaches more than once.
+
+    A topic reachable along several include/inherit paths contributes its
+    triggers once per path. Only the copy with the lowest ``{inherits}``
+    level (the first of those, if tied) can ever be matched, because the
+    others sort after it and test the same pattern, so keep just that one.
 
-    # Break if we're in too deep.
-    if depth > rs._depth:
-        rs._warn("Deep recursion while scanning topic inheritance")
+    Arguments:
+        triggers ([][]): The ``[trigger, data]`` pairs for a topic tree.
 
+    Returns:
+        [][]: The same pairs in the same order, without the duplicates.
+    """
+    best = {}
+    for index, trigger in enumerate(triggers):
+        match = RE.inherit.match(trigger[0])
+        level = int(match.group(1)) if match else sys.maxsize
+        key = id(trigger[1])
+        if key not in best or level < best[key][0]:
+            best[key] = (level, index)
+
+    if len(best) == len(triggers):
+        return triggers
+    keep = set(index for level, index in best.values())
+    return [trigger for index, trigger in enumerate(triggers) if index in keep]
+
+def _collect_topic_triggers(rs, key, depth):
+    """Scan a topic tree and cache the triggers of every topic in it.
+
+    This walks the tree with an explicit stack rather than by recursion.
+    Each frame is ``[key, child keys, next child, triggers so far]``, where a
+    key is the ``(topic, thats, inheritance, inherited)`` tuple that
+    ``get_topic_triggers()`` caches on. A topic is finished (and cached) once
+    all of its children are, then its triggers are handed to its parent.
+
+    Arguments:
+        rs (RiveScript): A reference to the parent RiveScript instance.
+        key (tuple): The cache key of the topic to start at.
+        depth (int): The depth of that topic.
+    """
     # Keep in mind here that there is a difference between 'includes' and
     # 'inherits' -- topics that inherit other topics are able to OVERRIDE
     # triggers that appear in the inherited topic. This means that if the top
@@ -39,8 +91,8 @@ def get_topic_triggers(rs, topic, thats, depth=0, inheritance=0, inherited=False
     # topics that inherit things will have their triggers always be on top of
     # the stack, from inherits=0 to inherits=n.
 
-    # Important info about the depth vs inheritance params to this function:
-    # depth increments by 1 each time this function recursively calls itrs.
+    # Important info about the depth vs inheritance counters:
+    # depth increments by 1 for each level down the topic tree.
     # inheritance increments by 1 only when this topic inherits another
     # topic.
     #
@@ -54,91 +106,140 @@ def get_topic_triggers(rs, topic, thats, depth=0, inheritance=0, inherited=False
     # that inherits other topics. This forces the {inherits} tag to be added
     # to the triggers. This only applies when the top topic 'includes'
     # another topic.
-    rs._say("\tCollecting trigger list for topic " + topic + "(depth="
-        + str(depth) + "; inheritance=" + str(inheritance) + "; "
-        + "inherited=" + str(inherited) + ")")
-
-    # topic:   the name of the topic
-    # depth:   starts at 0 and ++'s with each recursion
+    cache = rs._topic_cache["triggers"]
+    stack = [_open_topic(rs, key, depth)]
+    while stack:
+        frame = stack[-1]
+        key, children, triggers = frame[0], frame[1], frame[3]
+
+        # Collect the next included or inherited topic first.
+        if frame[2] < len(children):
+            child = children[frame[2]]
+            frame[2] += 1
+            if child in cache:
+                triggers.extend(cache[child])
+            elif depth + len(stack) > rs._depth:
+                rs._warn("Deep recursion while scanning topic inheritance")
+            else:
+                stack.append(_open_topic(rs, child, depth + len(stack)))
+            continue
+
+        # All the children are in; add this topic's own triggers.
+        stack.pop()
+        triggers.extend(_own_triggers(rs, key))
+        cache[key] = tuple(triggers)
+        if stack:
+            stack[-1][3].extend(cache[key])
+
+def _open_topic(rs, key, depth):
+    """Start a stack frame for ``_collect_topic_triggers()``."""
+    topic, thats, inheritance, inherited = key
+    rs._say("\tCollecting trigger list for topic {}(depth={}; inheritance={}; inherited={})",
+        topic, depth, inheritance, inherited)
 
     # Topic doesn't exist?
     if not topic in rs._topics:
         rs._warn("Inherited or included topic {} doesn't exist or has no triggers".format(
             topic
         ))
-        return []
+        return [key, (), 0, []]
+
+    children = []
+
+    # Does this topic include others?
+    for included in rs._includes.get(topic, ()):
+        rs._say("\t\tTopic {} includes {}", topic, included)
+        children.append((included, thats, inheritance, True))
+
+    # Does this topic inherit others?
+    for inherits in rs._lineage.get(topic, ()):
+        rs._say("\t\tTopic {} inherits {}", topic, inherits)
+        children.append((inherits, thats, inheritance + 1, False))
+
+    return [key, children, 0, []]
 
-    # Collect an array of triggers to return.
-    triggers = []
+def _own_triggers(rs, key):
+    """Get the ``(trigger, data)`` pairs that a topic defines itself."""
+    topic, thats, inheritance, inherited = key
+    if not topic in rs._topics:
+        return []
 
-    # Get those that exist in this topic directly.
-    inThisTopic = []
+    # Get those that exist in this topic directly. They're consumed once,
+    # below, so there's no need to copy them into a list first.
     if not thats:
         # The non-that structure is {topic}->[array of triggers]
-        if topic in rs._topics:
-            for trigger in rs._topics[topic]:
-                inThisTopic.append([ trigger["trigger"], trigger ])
+        inThisTopic = rs._topics[topic]
     else:
         # The 'that' structure is: {topic}->{cur trig}->{prev trig}->{trig info}
-        if topic in rs._thats.keys():
-            for curtrig in rs._thats[topic].keys():
-                for previous, pointer in rs._thats[topic][curtrig].items():
-                    inThisTopic.append([ pointer["trigger"], pointer ])
-
-    # Does this topic include others?
-    if topic in rs._includes:
-        # Check every included topic.
-        for includes in rs._includes[topic]:
-            rs._say("\t\tTopic " + topic + " includes " + includes)
-            triggers.extend(get_topic_triggers(rs, includes, thats, (depth + 1), inheritance, True))
-
-    # Does this topic inherit others?
-    if topic in rs._lineage:
-        # Check every inherited topic.
-        for inherits in rs._lineage[topic]:
-            rs._say("\t\tTopic " + topic + " inherits " + inherits)
-            triggers.extend(get_topic_triggers(rs, inherits, thats, (depth + 1), (inheritance + 1), False))
+        inThisTopic = (
+            pointer
+            for previous_triggers in rs._thats.get(topic, {}).values()
+            for pointer in previous_triggers.values()
+        )
 
     # Collect the triggers for *this* topic. If this topic inherits any
     # other topics, it means that this topic's triggers have higher
     # priority than those in any inherited topics. Enforce this with an
     # {inherits} tag.
     if topic in rs._lineage or inherited:
+        prefix = "{inherits=" + str(inheritance) + "}"
+        triggers = []
         for trigger in inThisTopic:
-            rs._say("\t\tPrefixing trigger with {inherits=" + str(inheritance) + "}" + trigger[0])
-            triggers.append(["{inherits=" + str(inheritance) + "}" + trigger[0], trigger[1]])
-    else:
-        triggers.extend(inThisTopic)
+            rs._say("\t\tPrefixing trigger with {}{}", prefix, trigger["trigger"])
+            triggers.append((prefix + trigger["trigger"], trigger))
+        return triggers
+    return [(trigger["trigger"], trigger) for trigger in inThisTopic]
 
-    return triggers
-
-def get_topic_tree(rs, topic, depth=0):
+def get_topic_tree(rs, topic):
     """Given one topic, get the list of all included/inherited topics.
 
+    The topics are listed depth-first, includes before inherits, with each
+    topic listed only once even when several branches share it (this also
+    makes cyclic includes harmless).
+
+    The result is cached in ``rs._topic_cache`` until the topic structure
+    changes, since this is looked up on every reply. Don't modify it.
+
     :param str topic: The topic to start the search at.
-    :param int depth: The recursion depth counter.
 
     :return []str: Array of topics.
     """
-
-    # Break if we're in too deep.
-    if depth > rs._depth:
-        rs._warn("Deep recursion while scanning topic trees!")
-        return []
+    cache = rs._topic_cache["tree"]
+    if topic in cache:
+        return cache[topic]
 
     # Collect an array of all topics.
-    topics = [topic]
-
-    # Does this topic include others?
-    if topic in rs._includes:
-        # Try each of these.
-        for includes in sorted(rs._includes[topic]):
-            topics.extend(get_topic_tree(rs, includes, depth + 1))
+    topics = []
+    seen   = set()
+    stack  = [topic]
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        topics.append(name)
+
+        # Push the inherited topics, then the included ones, in reverse so
+        # they come off the stack in sorted order with includes first.
+        stack.extend(sorted(rs._lineage.get(name, ()), reverse=True))
+        stack.extend(sorted(rs._includes.get(name, ()), reverse=True))
+
+    cache[topic] = tuple(topics)
+    return cache[topic]
+
+def get_previous_topics(rs, topic):
+    """Get the topics in a topic's tree that have any %Previous triggers.
+
+    This is ``get_topic_tree()`` minus the topics with nothing in the
+    %Previous sort buffer, so a reply doesn't need to check each of them
+    again. It's cached in ``rs._topic_cache`` alongside the tree.
 
-    # Does this topic inherit others?
-    if topic in rs._lineage:
-        # Try each of these.
-        for inherits in sorted(rs._lineage[topic]):
-            topics.extend(get_topic_tree(rs, inherits, depth + 1))
+    :param str topic: The topic to start the search at.
 
-    return topics
+    :return []str: Array of topics, in topic tree order.
+    """
+    cache = rs._topic_cache["previous"]
+    if topic not in cache:
+        thats = rs._sorted.get("thats", {})
+        cache[topic] = tuple(top for top in get_topic_tree(rs, topic) if thats.get(top))
+    return cache[topic]
@@ -8,8 +8,8 @@
 from __future__ import unicode_literals
 from .regexp import RE
 
-import re
 from collections import Counter, deque
+import sys
 
 # Version of RiveScript we support.
 rs_version = 2.0
@@ -36,6 +36,10 @@ class Parser(object):
             If not provided, you won't be able to get any warnings from
             this module. The warn function's prototype
             is ``def f(message, filename='', lineno='')``
+        syntax_check (bool): Check each line for syntax errors (true by
+            default). Turning this off saves some time when loading large
+            sets of replies already known to be valid, but a syntax error
+            will no longer stop the parse or be reported.
     """
 
     # Concatenation mode characters.
@@ -45,16 +49,32 @@ class Parser(object):
         newline="\n",
     )
 
-    def __init__(self, strict=True, utf8=False, on_debug=None, on_warn=None):
-        self.strict   = strict
-        self.utf8     = utf8
-        self.on_debug = on_debug
-        self.on_warn  = on_warn
+    # Bracket pairs for check_syntax().
+    bracket_pairs  = {'[': ']', '{': '}', '(': ')', '<': '>'}
+    bracket_rpairs = {v: k for k, v in bracket_pairs.items()}
+    bracket_names  = {'[': 'angle', '{': 'curly', '(': 'parenthesis', '<': 'angle'}
+    bracket_chars  = frozenset('[]{}()<>|')
+    not_angle      = frozenset('[{(')
+
+    def __init__(self, strict=True, utf8=False, on_debug=None, on_warn=None,
+                 syntax_check=True):
+        self.strict       = strict
+        self.utf8         = utf8
+        self.on_debug     = on_debug
+        self.on_warn      = on_warn
+        self.syntax_check = syntax_check
 
     # Proxy functions
-    def say(self, *args, **kwargs):
+    def say(self, message, *args):
+        """Send a debug message to ``on_debug``, if there is one.
+
+        Extra arguments are ``str.format()``'ed into the message only when
+        it's actually going to be sent.
+        """
         if self.on_debug is not None:
-            self.on_debug(*args, **kwargs)
+            if args:
+                message = message.format(*args)
+            self.on_debug(message)
 
     def warn(self, *args, **kwargs):
         if self.on_warn is not None:
@@ -110,7 +130,9 @@ class Parser(object):
         Args:
             filename (str): The name of the file that the code came from, for
                 syntax error reporting purposes.
-            code (str[]): The source code to parse.
+            code (str[]): The source code to parse. Any iterable of lines
+                works; it's read into a list if it isn't one already, since
+                the ^Continue lookahead needs to index ahead.
 
         Returns:
             dict: The aforementioned data structure.
@@ -131,32 +153,40 @@ class Parser(object):
 
         # Track temporary variables.
         topic   = 'random'  # Default topic=random
-        lineno  = 0         # Line numbers for syntax tracking
         comment = False     # In a multi-line comment
         inobj   = False     # In an object
         objname = ''        # The name of the object we're in
         objlang = ''        # The programming language of the object
         objbuf  = []        # Object contents buffer
+        curtopic = None     # Pointer to the current topic in ast.topics
         curtrig = None      # Pointer to the current trigger in ast.topics
         isThat  = None      # Is a %Previous trigger
 
+        # Look these up once rather than for every line.
+        say  = self.say
+        warn = self.warn
+        syntax_check = self.syntax_check
+
+        # The lookahead indexes into the code, so make sure we can.
+        if not isinstance(code, (list, tuple)):
+            code = list(code)
+        ncode = len(code)
+
         # Local (file scoped) parser options.
         local_options = dict(
             concat="none",  # Concat mode for ^Continue command
         )
 
         # Read each line.
-        for lp, line in enumerate(code):
-            lineno += 1
+        for lp, line, stripped in self._lines(code):
+            lineno = lp + 1
 
-            self.say("Line: " + line + " (topic: " + topic + ") incomment: " + str(comment) + \
-                    ", inobj: " + str(inobj))
-            if len(line.strip()) == 0:  # Skip blank lines
-                continue
+            say("Line: {} (topic: {}) incomment: {}, inobj: {}",
+                line, topic, comment, inobj)
 
             # In an object?
             if inobj:
-                if re.match(RE.objend, line):
+                if RE.objend.match(line):
                     # End the object.
                     if len(objname):
                         ast["objects"].append({
@@ -172,16 +202,17 @@ class Parser(object):
                     objbuf.append(line)
                 continue
 
-            line = line.strip()  # Trim excess space. We do it down here so we
-                                 # don't mess up python objects!
-            line = RE.ws.sub(" ", line)  # Replace the multiple whitespaces by single whitespace
+            line = stripped  # Trim excess space. We do it down here so we
+                             # don't mess up python objects!
 
-            # Look for comments.
-            if line[:2] == '//':  # A single-line comment.
+            # Look for comments. Collapsing whitespace can't change any of
+            # these tests, so do it only for the lines that survive them.
+            first = line[0]
+            if first == '/' and line[:2] == '//':  # A single-line comment.
                 continue
-            elif line[0] == '#':
-                self.warn("Using the # symbol for comments is deprecated", filename, lineno)
-            elif line[:2] == '/*':  # Start of a multi-line comment.
+            elif first == '#':
+                warn("Using the # symbol for comments is deprecated", filename, lineno)
+            elif first == '/' and line[:2] == '/*':  # Start of a multi-line comment.
                 if '*/' not in line:  # Cancel if the end is here too.
                     comment = True
                 continue
@@ -191,9 +222,11 @@ class Parser(object):
             if comment:
                 continue
 
+            line = RE.ws.sub(" ", line)  # Replace the multiple whitespaces by single whitespace
+
             # Separate the command from the data.
             if len(line) < 2:
-                self.warn("Weird single-character line '" + line + "' found.", filename, lineno)
+                warn("Weird single-character line '" + line + "' found.", filename, lineno)
                 continue
             cmd = line[0]
             line = line[1:].strip()
@@ -203,7 +236,7 @@ class Parser(object):
                 line = line.split(" //")[0].strip()
 
             # Run a syntax check on this line.
-            syntax_error = self.check_syntax(cmd, line)
+            syntax_error = self.check_syntax(cmd, line) if syntax_check else None
             if syntax_error:
                 # There was a syntax error! Are we enforcing strict mode?
                 syntax_error = "Syntax error in " + filename + " line " + str(lineno) + ": " \
@@ -211,63 +244,114 @@ class Parser(object):
                 if self.strict:
                     raise Exception(syntax_error)
                 else:
-                    self.warn(syntax_error)
+                    warn(syntax_error)
                     return  # Don't try to continue
 
             # Reset the %Previous state if this is a new +Trigger.
             if cmd == '+':
                 isThat = None
 
-            # Do a lookahead for ^Continue and %Previous commands.
-            for i in range(lp + 1, len(code)):
-                lookahead = code[i].strip()
-                if len(lookahead) < 2:
-                    continue
-                lookCmd = lookahead[0]
-                lookahead = lookahead[1:].strip()
-                lookahead = re.sub(RE.space, ' ', lookahead)  # Replace the `\s` in the message
-
-                # Only continue if the lookahead line has any data.
-                if len(lookahead) != 0:
-                    # The lookahead command has to be either a % or a ^.
-                    if lookCmd != '^' and lookCmd != '%':
-                        break
-
-                    # If the current command is a +, see if the following is
-                    # a %.
-                    if cmd == '+':
-                        if lookCmd == '%':
-                            isThat = lookahead
-                            break
-                        else:
-                            isThat = None
-
-                    # If the current command is a ! and the next command(s) are
-                    # ^, we'll tack each extension on as a line break (which is
-                    # useful information for arrays).
-                    if cmd == '!':
-                        if lookCmd == '^':
-                            line += "<crlf>" + lookahead
+            # Do a lookahead for ^Continue and %Previous commands. A ^Continue
+            # line itself can't pick anything up (its command already took
+            # the whole run of ^'s), so skip the scan instead of walking the
+            # rest of the run again for every line in it.
+            if cmd != '^':
+                for i in range(lp + 1, ncode):
+                    lookahead = code[i].strip()
+                    if len(lookahead) < 2:
                         continue
+                    lookCmd = lookahead[0]
+                    lookahead = lookahead[1:].strip()
 
-                    # If the current command is not a ^ and the line after is
-                    # not a %, but the line after IS a ^, then tack it on to the
-                    # end of the current line.
-                    if cmd != '^' and lookCmd != '%':
-                        if lookCmd == '^':
-                            line += self.concat_modes.get(
-                                local_options["concat"], ""
-                            ) + lookahead
-                        else:
+                    # Only continue if the lookahead line has any data.
+                    if len(lookahead) != 0:
+                        # The lookahead command has to be either a % or a ^.
+                        if lookCmd != '^' and lookCmd != '%':
                             break
+                        lookahead = RE.space.sub(' ', lookahead)  # Replace the `\s` in the message
+
+                        # If the current command is a +, see if the following is
+                        # a %.
+                        if cmd == '+':
+                            if lookCmd == '%':
+                                isThat = lookahead
+                                break
+                            else:
+                                isThat = None
+
+                        # If the current command is a ! and the next command(s) are
+                        # ^, we'll tack each extension on as a line break (which is
+                        # useful information for arrays).
+                        if cmd == '!':
+                            if lookCmd == '^':
+                                line += "<crlf>" + lookahead
+                            continue
+
+                        # If the line after is not a %, but the line after IS a
+                        # ^, then tack it on to the end of the current line.
+                        if lookCmd != '%':
+                            if lookCmd == '^':
+                                line += self.concat_modes.get(
+                                    local_options["concat"], ""
+                                ) + lookahead
+                            else:
+                                break
+
+            say("Command: {}; line: {}", cmd, line)
+
+            # Handle the types of RiveScript commands. The most common ones
+            # (replies and triggers) are tested first.
+            if cmd == '-':
+                # - REPLY
+                if curtrig is None:
+                    warn("Response found before trigger", filename, lineno)
+                    continue
 
-            self.say("Command: " + cmd + "; line: " + line)
+                say("\tResponse: {}", line)
+                curtrig["reply"].append(line.strip())
+            elif cmd == '+':
+                # + TRIGGER
+                say("\tTrigger pattern: {}", line)
 
-            # Handle the types of RiveScript commands.
-            if cmd == '!':
+                # Initialize the topic tree, unless this topic already was.
+                if curtopic is None:
+                    curtopic = self._init_topic(ast["topics"], topic)
+                curtrig = {
+                    "trigger": sys.intern(line),
+                    "reply": [],
+                    "condition": [],
+                    "redirect": None,
+                    "previous": isThat,
+                }
+                curtopic["triggers"].append(curtrig)
+                curtopic["syntax"][curtrig["trigger"]] = \
+                        dict(previous=isThat, filename=filename, lineno=lineno)
+            elif cmd == '*':
+                # * CONDITION
+                if curtrig is None:
+                    warn("Condition found before trigger", filename, lineno)
+                    continue
+
+                say("\tAdding condition: {}", line)
+                curtrig["condition"].append(line.strip())
+            elif cmd == '@':
+                # @ REDIRECT
+                if curtrig is None:
+                    warn("Redirect found before trigger", filename, lineno)
+                    continue
+
+                say("\tRedirect: {}", line)
+                curtrig["redirect"] = line.strip()
+            elif cmd == '^':
+                # ^ CONTINUE
+                pass  # This was handled above.
+            elif cmd == '%':
+                # % PREVIOUS
+                pass  # This was handled above.
+            elif cmd == '!':
                 # ! DEFINE
-                halves = re.split(RE.equals, line, 1)
-                left = re.split(RE.ws, halves[0].strip(), 2)
+                halves = RE.equals.split(line, 1)
+                left = RE.ws.split(halves[0].strip(), 2)
                 value, type, var = '', '', ''
                 if len(halves) == 2:
                     value = halves[1].strip()
@@ -278,41 +362,41 @@ class Parser(object):
 
                 # Remove 'fake' line breaks unless this is an array.
                 if type != 'array':
-                    value = re.sub(RE.crlf, '', value)
+                    value = RE.crlf.sub('', value)
 
                 # Handle version numbers.
                 if type == 'version':
                     # Verify we support it.
                     try:
                         if float(value) > rs_version:
-                            self.warn("Unsupported RiveScript version. We only support " + rs_version, filename, lineno)
+                            warn("Unsupported RiveScript version. We only support " + rs_version, filename, lineno)
                             return
                     except:
-                        self.warn("Error parsing RiveScript version number: not a number", filename, lineno)
+                        warn("Error parsing RiveScript version number: not a number", filename, lineno)
                     continue
 
                 # All other types of defines require a variable and value name.
                 if len(var) == 0:
-                    self.warn("Undefined variable name", filename, lineno)
+                    warn("Undefined variable name", filename, lineno)
                     continue
                 elif len(value) == 0:
-                    self.warn("Undefined variable value", filename, lineno)
+                    warn("Undefined variable value", filename, lineno)
                     continue
 
                 # Handle the rest of the types.
                 if type == 'local':
                     # Local file-scoped parser options.
-                    self.say("\tSet parser option " + var + " = " + value)
+                    say("\tSet parser option " + var + " = " + value)
                     local_options[var] = value
                 elif type == 'global':
                     # 'Global' variables
-                    self.say("\tSet global " + var + " = " + value)
+                    say("\tSet global " + var + " = " + value)
 
                     if value == '<undef>':
                         try:
                             del(ast["begin"]["global"][var])
                         except:
-                            self.warn("Failed to delete missing global variable", filename, lineno)
+                            warn("Failed to delete missing global variable", filename, lineno)
                     else:
                         ast["begin"]["global"][var] = value
 
@@ -326,7 +410,7 @@ class Parser(object):
                         try:
                             value = int(value)
                         except:
-                            self.warn("Failed to set 'depth' because the value isn't a number!", filename, lineno)
+                            warn("Failed to set 'depth' because the value isn't a number!", filename, lineno)
                     elif var == 'strict':
                         if value.lower() == 'true':
                             value = True
@@ -334,24 +418,24 @@ class Parser(object):
                             value = False
                 elif type == 'var':
                     # Bot variables
-                    self.say("\tSet bot variable " + var + " = " + value)
+                    say("\tSet bot variable " + var + " = " + value)
 
                     if value == '<undef>':
                         try:
                             del(ast["begin"]["var"][var])
                         except:
-                            self.warn("Failed to delete missing bot variable", filename, lineno)
+                            warn("Failed to delete missing bot variable", filename, lineno)
                     else:
                         ast["begin"]["var"][var] = value
                 elif type == 'array':
                     # Arrays
-                    self.say("\tArray " + var + " = " + value)
+                    say("\tArray " + var + " = " + value)
 
                     if value == '<undef>':
                         try:
                             del(ast["begin"]["array"][var])
                         except:
-                            self.warn("Failed to delete missing array", filename, lineno)
+                            warn("Failed to delete missing array", filename, lineno)
                         continue
 
                     # Did this have multiple parts?
@@ -363,40 +447,37 @@ class Parser(object):
                         if '|' in val:
                             fields.extend(val.split('|'))
                         else:
-                            fields.extend(re.split(RE.ws, val))
+                            fields.extend(RE.ws.split(val))
 
                     # Convert any remaining '\s' escape codes into spaces.
-                    for f in fields:
-                        f = f.replace(r'\s', ' ')
-
-                    ast["begin"]["array"][var] = fields
+                    ast["begin"]["array"][var] = [f.replace(r'\s', ' ') for f in fields]
                 elif type == 'sub':
                     # Substitutions
-                    self.say("\tSubstitution " + var + " => " + value)
+                    say("\tSubstitution " + var + " => " + value)
 
                     if value == '<undef>':
                         try:
                             del(ast["begin"]["sub"][var])
                         except:
-                            self.warn("Failed to delete missing substitution", filename, lineno)
+                            warn("Failed to delete missing substitution", filename, lineno)
                     else:
                         ast["begin"]["sub"][var] = value
                 elif type == 'person':
                     # Person Substitutions
-                    self.say("\tPerson Substitution " + var + " => " + value)
+                    say("\tPerson Substitution " + var + " => " + value)
 
                     if value == '<undef>':
                         try:
                             del(ast["begin"]["person"][var])
                         except:
-                            self.warn("Failed to delete missing person substitution", filename, lineno)
+                            warn("Failed to delete missing person substitution", filename, lineno)
                     else:
                         ast["begin"]["person"][var] = value
                 else:
-                    self.warn("Unknown definition type '" + type + "'", filename, lineno)
+                    warn("Unknown definition type '" + type + "'", filename, lineno)
             elif cmd == '>':
                 # > LABEL
-                temp = re.split(RE.ws, line)
+                temp = RE.ws.split(line)
                 type   = temp[0]
                 name   = ''
                 fields = []
@@ -408,17 +489,17 @@ class Parser(object):
                 # Handle the label types.
                 if type == 'begin':
                     # The BEGIN block.
-                    self.say("\tFound the BEGIN block.")
+                    say("\tFound the BEGIN block.")
                     type = 'topic'
                     name = '__begin__'
                 if type == 'topic':
                     # Starting a new topic.
-                    self.say("\tSet topic to " + name)
+                    say("\tSet topic to " + name)
                     curtrig = None
-                    topic  = name
+                    topic  = sys.intern(name)
 
                     # Initialize the topic tree.
-                    self._init_topic(ast["topics"], topic)
+                    curtopic = self._init_topic(ast["topics"], topic)
 
                     # Does this topic include or inherit another one?
                     mode = ''  # or 'inherits' or 'includes'
@@ -431,9 +512,9 @@ class Parser(object):
                             elif mode != '':
                                 # This topic is either inherited or included.
                                 if mode == 'includes':
-                                    ast["topics"][name]["includes"][field] = 1
+                                    curtopic["includes"][sys.intern(field)] = 1
                                 else:
-                                    ast["topics"][name]["inherits"][field] = 1
+                                    curtopic["inherits"][sys.intern(field)] = 1
                 elif type == 'object':
                     # If a field was provided, it should be the programming
                     # language.
@@ -444,7 +525,7 @@ class Parser(object):
                     # Only try to parse a language we support.
                     curtrig = None
                     if lang is None:
-                        self.warn("Trying to parse unknown programming language", filename, lineno)
+                        warn("Trying to parse unknown programming language", filename, lineno)
                         lang = 'python'  # Assume it's Python.
 
                     # We have a handler, so start loading the code.
@@ -453,68 +534,42 @@ class Parser(object):
                     objbuf  = []
                     inobj   = True
                 else:
-                    self.warn("Unknown label type '" + type + "'", filename, lineno)
+                    warn("Unknown label type '" + type + "'", filename, lineno)
             elif cmd == '<':
                 # < LABEL
                 type = line
 
                 if type == 'begin' or type == 'topic':
-                    self.say("\tEnd topic label.")
+                    say("\tEnd topic label.")
                     topic = 'random'
+                    curtopic = None
                 elif type == 'object':
-                    self.say("\tEnd object label.")
+                    say("\tEnd object label.")
                     inobj = False
-            elif cmd == '+':
-                # + TRIGGER
-                self.say("\tTrigger pattern: " + line)
+            else:
+                warn("Unrecognized command \"" + cmd + "\"", filename, lineno)
+                continue
 
-                # Initialize the topic tree.
-                self._init_topic(ast["topics"], topic)
-                curtrig = {
-                    "trigger": line,
-                    "reply": [],
-                    "condition": [],
-                    "redirect": None,
-                    "previous": isThat,
-                }
-                ast["topics"][topic]["triggers"].append(curtrig)
-                ast["topics"][topic]["syntax"][line] = \
-                        dict(previous=isThat, filename=filename, lineno=lineno)
-            elif cmd == '-':
-                # - REPLY
-                if curtrig is None:
-                    self.warn("Response found before trigger", filename, lineno)
-                    continue
+        return ast
 
-                self.say("\tResponse: " + line)
-                curtrig["reply"].append(line.strip())
-            elif cmd == '%':
-                # % PREVIOUS
-                pass  # This was handled above.
-            elif cmd == '^':
-                # ^ CONTINUE
-                pass  # This was handled above.
-            elif cmd == '@':
-                # @ REDIRECT
-                if curtrig is None:
-                    self.warn("Redirect found before trigger", filename, lineno)
-                    continue
+    def _lines(self, code):
+        """Iterate over the non-blank lines of a document.
 
-                self.say("\tRedirect: " + line)
-                curtrig["redirect"] = line.strip()
-            elif cmd == '*':
-                # * CONDITION
-                if curtrig is None:
-                    self.warn("Condition found before trigger", filename, lineno)
-                    continue
+        Blank lines mean nothing anywhere in RiveScript, not even inside an
+        object macro, so they're dropped before the parser's state machine
+        sees them. Each line is stripped only once here.
 
-                self.say("\tAdding condition: " + line)
-                curtrig["condition"].append(line.strip())
-            else:
-                self.warn("Unrecognized command \"" + cmd + "\"", filename, lineno)
-                continue
+        Args:
+            code (str[]): The source code to parse.
 
-        return ast
+        Yields:
+            tuple: ``(index, line, stripped line)`` for each non-blank line,
+                where ``index`` is the line's 0-based position in ``code``.
+        """
+        for lp, line in enumerate(code):
+            stripped = line.strip()
+            if stripped:
+                yield lp, line, stripped
 
     def check_syntax(self, cmd, line):
         """Syntax check a line of RiveScript code.
@@ -536,7 +591,7 @@ class Parser(object):
             #     ! type name = value
             #     OR
             #     ! type = value
-            match = re.match(RE.def_syntax, line)
+            match = RE.def_syntax.match(line)
             if not match:
                 return "Invalid format for !Definition line: must be '! type name = value' OR '! type = value'"
         elif cmd == '>':
@@ -544,15 +599,15 @@ class Parser(object):
             #   - The "begin" label must have only one argument ("begin")
             #   - "topic" labels must be lowercased but can inherit other topics (a-z0-9_\s)
             #   - "object" labels must follow the same rules as "topic", but don't need to be lowercase
-            parts = re.split(" ", line, 2)
+            parts = line.split(" ", 2)
             if parts[0] == "begin" and len(parts) > 1:
                 return "The 'begin' label takes no additional arguments, should be verbatim '> begin'"
             elif parts[0] == "topic":
-                search = re.search(RE.name_syntax, line)
+                search = RE.name_syntax.search(line)
                 if search:
                     return "Topics should be lowercased and contain only numbers and letters"
             elif parts[0] == "object":
-                search = re.search(RE.obj_syntax, line) # Upper case is allowed
+                search = RE.obj_syntax.search(line) # Upper case is allowed
                 if search:
                     return "Objects can only contain numbers and letters"
         elif cmd == '+' or cmd == '%' or cmd == '@':
@@ -564,48 +619,47 @@ class Parser(object):
             #   - All brackets should be matched
             #   - No empty option with pipe such as ||, [|, |], (|, |) and whitespace between
 
-            pairs = {'[': ']', '{': '}', '(': ')', '<': '>'}
-            rpairs = {v: k for k, v in pairs.items()}
-            bnames = {'[': 'angle', '{': 'curly', '(': 'parenthesis', '<': 'angle'}
-            not_angle = set(pairs.keys())
-            not_angle.remove('<')
+            pairs = self.bracket_pairs
+            rpairs = self.bracket_rpairs
+            bnames = self.bracket_names
+            not_angle = self.not_angle
 
             q = deque()
             c = Counter()
 
-            for char in line:
-                if char in pairs:
-                    q.append(char)
-                    c[char] += 1
-                    if char in not_angle and c['<']:
-                        return "Angle bracket must be closed before closing or opening other type of brackets"
-                elif char in rpairs:
-                    p = rpairs[char]
-                    if len(q) == 0:
-                        return "Unmatched " + bnames[p] + " brackets"
-                    if q.pop() != p:
-                        return "Unbalanced brackets"
-                    c[rpairs[char]] -= 1
-                elif char == '|':
-                    if c['('] == 0 and c['['] == 0:   # Pipe outside the alternative and option
-                        return "Pipe | must be within parenthesis brackets or square brackets"
+            # Plain triggers have nothing to balance, so only walk the line
+            # character by character if it has any brackets or pipes.
+            if not self.bracket_chars.isdisjoint(line):
+                for char in line:
+                    if char in pairs:
+                        q.append(char)
+                        c[char] += 1
+                        if char in not_angle and c['<']:
+                            return "Angle bracket must be closed before closing or opening other type of brackets"
+                    elif char in rpairs:
+                        p = rpairs[char]
+                        if len(q) == 0:
+                            return "Unmatched " + bnames[p] + " brackets"
+                        if q.pop() != p:
+                            return "Unbalanced brackets"
+                        c[rpairs[char]] -= 1
+                    elif char == '|':
+                        if c['('] == 0 and c['['] == 0:   # Pipe outside the alternative and option
+                            return "Pipe | must be within parenthesis brackets or square brackets"
             if len(q) != 0:
-                return "Unmatched " + bnames(q.pop()) + " brackets"
-
-            # Check for empty pipe
-            search = re.search(RE.empty_pipe, line)
-            if search:
-                return "Piped arrays can't include blank entries"
-
-            # In UTF-8 mode, most symbols are allowed.
-            if self.utf8:
-                search = re.search(RE.utf8_trig, line)
-                if search:
+                return "Unmatched " + bnames[q.pop()] + " brackets"
+
+            # Look for empty pipes and forbidden symbols in one pass. In UTF-8
+            # mode, most symbols are allowed. Valid lines stop here; only a
+            # bad one is searched again to pick the error message.
+            check = RE.utf8_trig_check if self.utf8 else RE.trig_check
+            if check.search(line):
+                # Check for empty pipe
+                if RE.empty_pipe.search(line):
+                    return "Piped arrays can't include blank entries"
+                if self.utf8:
                     return "Triggers can't contain uppercase letters, backslashes or dots in UTF-8 mode."
-            else:
-                search = re.search(RE.trig_syntax, line)
-                if search:
-                    return "Triggers may only contain lowercase letters, numbers, and these symbols: ( | ) [ ] * _ # @ { } < > ="
+                return "Triggers may only contain lowercase letters, numbers, and these symbols: ( | ) [ ] * _ # @ { } < > ="
         elif cmd == '-' or cmd == '^' or cmd == '/':
             # - Trigger, ^ Continue, / Comment
             # These commands take verbatim arguments, so their syntax is loose.
@@ -614,7 +668,7 @@ class Parser(object):
             # * Condition
             #   Syntax for a conditional is as follows:
             #   * value symbol value => response
-            match = re.match(RE.cond_syntax, line)
+            match = RE.cond_syntax.match(line)
             if not match:
                 return "Invalid format for !Condition: should be like '* value symbol value => response'"
 
@@ -631,7 +685,7 @@ class Parser(object):
             name (str): The name of the topic to initialize.
 
         Returns:
-            None
+            dict: The topic's data structure.
         """
         if not name in topics:
             topics[name] = {
@@ -640,3 +694,4 @@ class Parser(object):
                 "triggers": [],
                 "syntax": {},
             }
+        return topics[name]
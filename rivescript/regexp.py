@@ -18,8 +18,8 @@ class RE(object):
     objend      = re.compile('^\s*<\s*object')
     weight      = re.compile(r'\s*\{weight=(\d+)\}\s*')
     inherit     = re.compile('\{inherits=(\d+)\}')
-    wilds_and_optionals = re.compile('[\s\*\#\_\[\]()]+')
-    nasties     = re.compile('[^A-Za-z0-9 ]')
+    word        = re.compile(r'\S+')
+    plain_word  = re.compile(r'[^\s\*\#\_\[\]()]+')
     crlf        = re.compile('<crlf>')
     literal_w   = re.compile(r'\\w')
     array       = re.compile(r'\@(.+?)\b')
@@ -33,6 +33,7 @@ class RE(object):
     cond_syntax = re.compile(r'^.+?\s*(?:==|eq|!=|ne|<>|<|<=|>|>=)\s*.+?=>.+?$')
     utf8_meta   = re.compile(r'[\\<>]')
     utf8_punct  = re.compile(r'[.?,!;:@#$%^&*()]')
+    unicode_punct = re.compile(r'[.,!?;:]')
     cond_split  = re.compile(r'\s*=>\s*')
     cond_parse  = re.compile(r'^(.+?)\s+(==|eq|!=|ne|<>|<|<=|>|>=)\s+(.+?)$')
     topic_tag   = re.compile(r'\{topic=(.+?)\}')
@@ -45,8 +46,16 @@ class RE(object):
     reply_tags  = re.compile(r'<reply([1-9])>')
     random_tags = re.compile(r'\{random\}(.+?)\{/random\}')
     redir_tag   = re.compile(r'\{@(.+?)\}')
-    tag_search  = re.compile(r'<([^<]+?)>')
-    placeholder = re.compile(r'\x00(\d+)\x00')
+    call_tag    = re.compile(r'<call>(.+?)</call>')
+    format_tags = dict(
+        (item, re.compile(r'\{' + item + r'\}(.+?)\{/' + item + r'\}'))
+        for item in ['person', 'formal', 'sentence', 'uppercase', 'lowercase']
+    )
+    tag_bracket = re.compile(r'[<>]')
+    tag_shortcuts = re.compile(r'<(?:person|@|formal|sentence|uppercase|lowercase)>|\\[sn#]|\s*\{weight=\d+\}\s*')
     zero_star   = re.compile(r'^\*$')
     optionals   = re.compile(r'\[(.+?)\]')
     empty_pipe   = re.compile(r'\|\s*\||\[\s*\||\|\s*\]|\(\s*\||\|\s*\)')  # ||, [|, |], (|, |)
+    # Any trigger syntax error at all: an empty pipe or a forbidden symbol.
+    trig_check      = re.compile(empty_pipe.pattern + '|' + trig_syntax.pattern)
+    utf8_trig_check = re.compile(empty_pipe.pattern + '|' + utf8_trig.pattern)
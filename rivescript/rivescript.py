@@ -7,12 +7,11 @@
 
 from __future__ import unicode_literals
 from six import text_type
-import copy
 import sys
 import os
-import re
 import pprint
-import codecs
+import pickle
+import io
 
 from . import __version__
 from . import python
@@ -21,6 +20,7 @@ from . import inheritance as inherit_utils
 from . import utils
 from .brain import Brain
 from .parser import Parser
+from .regexp import RE
 from .sessions import MemorySessionStorage
 from .exceptions import (
     RS_ERR_MATCH, RS_ERR_REPLY, RS_ERR_DEEP_RECURSION
@@ -58,6 +58,11 @@ class RiveScript(object):
             information. If you have your own session manager that you'd like
             to use instead, pass its instantiated class instance as this
             parameter.
+        syntax_check (bool): Check the syntax of RiveScript code as it's
+            loaded. This is on (``True``) by default. Turning it off makes
+            loading large reply sets faster, but syntax errors will go
+            unreported (even in strict mode), so only do this for code that's
+            known to be valid.
     """
 
     ############################################################################
@@ -65,7 +70,7 @@ class RiveScript(object):
     ############################################################################
 
     def __init__(self, debug=False, strict=True, depth=50, log=None,
-                 utf8=False, session_manager=None):
+                 utf8=False, session_manager=None, syntax_check=True):
         """Initialize a new RiveScript interpreter."""
 
         ###
@@ -78,12 +83,12 @@ class RiveScript(object):
 
         # If the log file was given as a string, turn it into a filehandle.
         if log is not None:
-            if type(log) in [text_type, str]:
-                self._log = codecs.open(log, "a", "utf-8")
+            if isinstance(log, text_type):
+                self._log = io.open(log, "a", encoding="utf-8")
 
         # Unicode stuff
         self._utf8               = utf8  # UTF-8 mode
-        self.unicode_punctuation = re.compile(r'[.,!?;:]')
+        self.unicode_punctuation = RE.unicode_punct
 
         # Misc.
         self._strict = strict  # Strict mode
@@ -104,11 +109,21 @@ class RiveScript(object):
         self._topics   = {}      # Main reply structure
         self._thats    = {}      # %Previous reply structure
         self._sorted   = {}      # Sorted buffers
+        self._dirty_topics = set()  # Topics changed since the last sort
         self._syntax   = {}      # Syntax tracking (filenames & line no.'s)
+        self._topic_cache = {    # Memoized topic inheritance lookups.
+            "triggers": {},
+            "tree":     {},
+            "previous": {},
+            "index":    {},
+            "weights":  {},
+        }
         self._regexc   = {       # Precomputed regexes for speed optimizations.
             "trigger": {},
-            "sub":    {},
-            "person":  {},
+            "sub":     None,
+            "person":  None,
+            "array":   {},
+            "array_trigger": {},
         }
 
         # Initialize the session manager.
@@ -120,8 +135,9 @@ class RiveScript(object):
         self._parser = Parser(
             strict=self._strict,
             utf8=self._utf8,
-            on_debug=lambda message: self._say(message),
+            on_debug=self._say,
             on_warn=lambda message, filename, lineno: self._warn(message, filename, lineno),
+            syntax_check=syntax_check,
         )
         self._brain = Brain(
             master=self,
@@ -142,7 +158,17 @@ class RiveScript(object):
         object instance."""
         return __version__
 
-    def _say(self, message):
+    def _say(self, message, *args):
+        """Emit a debug message.
+
+        Extra arguments are ``str.format()``'ed into the message only when
+        debugging or logging is on, so hot paths can pass their values
+        without building a string that would just be thrown away.
+        """
+        if not (self._debug or self._log):
+            return
+        if args:
+            message = message.format(*args)
         if self._debug and not self._log:
             print("[RS] {}".format(message))
         if self._log:
@@ -198,9 +224,10 @@ class RiveScript(object):
         """
         self._say("Loading file: " + filename)
 
-        fh    = codecs.open(filename, 'r', 'utf-8')
-        lines = fh.readlines()
-        fh.close()
+        # io's decoder runs in C, unlike codecs.open()'s StreamReader. Split
+        # the lines the same way codecs' readlines() did.
+        with io.open(filename, 'r', encoding='utf-8', newline='') as fh:
+            lines = fh.read().splitlines(True)
 
         self._say("Parsing " + str(len(lines)) + " lines of code from " + filename)
         self._parse(filename, lines)
@@ -212,7 +239,7 @@ class RiveScript(object):
             lines of RiveScript code.
         """
         self._say("Streaming code.")
-        if type(code) in [str, text_type]:
+        if isinstance(code, text_type):
             code = code.split("\n")
         self._parse("stream()", code)
 
@@ -235,9 +262,11 @@ class RiveScript(object):
                 else:
                     internal[name] = value
 
-                # Precompile substitutions.
-                if kind in ["sub", "person"]:
-                    self._precompile_substitution(kind, name)
+            # Arrays can reference each other, so any change invalidates
+            # all the cached array regexps.
+            if kind == "array" and data:
+                self._regexc["array"] = {}
+                self._regexc["array_trigger"] = {}
 
         # Let the scripts set the debug mode and other special globals.
         if self._global.get("debug"):
@@ -246,35 +275,32 @@ class RiveScript(object):
             self._depth = int(self._global["depth"])
 
         # Consume all the parsed triggers.
+        if ast["topics"]:
+            self._clear_topic_cache()
+        precompile = self._precompile_regexp
         for topic, data in ast["topics"].items():
+            self._dirty_topics.add(topic)
+
             # Keep a map of the topics that are included/inherited under this topic.
-            if not topic in self._includes:
-                self._includes[topic] = {}
-            if not topic in self._lineage:
-                self._lineage[topic] = {}
-            self._includes[topic].update(data["includes"])
-            self._lineage[topic].update(data["inherits"])
+            self._includes.setdefault(topic, {}).update(data["includes"])
+            self._lineage.setdefault(topic, {}).update(data["inherits"])
 
             # Consume the triggers.
-            if not topic in self._topics:
-                self._topics[topic] = []
+            triggers = self._topics.setdefault(topic, [])
+            triggers.extend(data["triggers"])
             for trigger in data["triggers"]:
-                self._topics[topic].append(trigger)
-
                 # Precompile the regexp for this trigger.
-                self._precompile_regexp(trigger["trigger"])
+                precompile(trigger["trigger"])
 
                 # Does this trigger have a %Previous? If so, make a pointer to
                 # this exact trigger in _thats.
-                if trigger["previous"] is not None:
+                previous = trigger["previous"]
+                if previous is not None:
                     # Precompile the regexp for the previous too.
-                    self._precompile_regexp(trigger["previous"])
+                    precompile(previous)
 
-                    if not topic in self._thats:
-                        self._thats[topic] = {}
-                    if not trigger["trigger"] in self._thats[topic]:
-                        self._thats[topic][trigger["trigger"]] = {}
-                    self._thats[topic][trigger["trigger"]][trigger["previous"]] = trigger
+                    thats = self._thats.setdefault(topic, {})
+                    thats.setdefault(trigger["trigger"], {})[previous] = trigger
 
             self._syntax[topic] = data["syntax"]
 
@@ -285,13 +311,18 @@ class RiveScript(object):
                 self._objlangs[obj["name"]] = obj["language"]
                 self._handlers[obj["language"]].load(obj["name"], obj["code"])
 
-    def deparse(self):
+    def deparse(self, copy=True):
         """Dump the in-memory RiveScript brain as a Python data structure.
 
         This would be useful, for example, to develop a user interface for
         editing RiveScript replies without having to edit the RiveScript
         source code directly.
 
+        :param bool copy: Copy the loaded data into the result, so it can be
+            edited freely (the default). Pass ``False`` to get the in-memory
+            data itself, which is faster if you only need to read it. Don't
+            modify the result in that case.
+
         :return dict: JSON-serializable Python data structure containing the
             contents of all RiveScript replies currently loaded in memory.
         """
@@ -316,14 +347,21 @@ class RiveScript(object):
             result["begin"]["global"]["depth"] = self._depth
 
         # Definitions
-        result["begin"]["var"]    = self._var.copy()
-        result["begin"]["sub"]    = self._sub.copy()
-        result["begin"]["person"] = self._person.copy()
-        result["begin"]["array"]  = self._array.copy()
-        result["begin"]["global"].update(self._global.copy())
+        if copy:
+            result["begin"]["var"]    = self._var.copy()
+            result["begin"]["sub"]    = self._sub.copy()
+            result["begin"]["person"] = self._person.copy()
+            result["begin"]["array"]  = self._array.copy()
+        else:
+            result["begin"]["var"]    = self._var
+            result["begin"]["sub"]    = self._sub
+            result["begin"]["person"] = self._person
+            result["begin"]["array"]  = self._array
+        result["begin"]["global"].update(self._global)
 
         # Topic Triggers.
-        for topic in self._topics:
+        relations = (("inherits", self._lineage), ("includes", self._includes))
+        for topic, triggers in self._topics.items():
             dest = None  # Where to place the topic info
 
             if topic == "__begin__":
@@ -340,20 +378,35 @@ class RiveScript(object):
                 dest = result["topics"][topic]
 
             # Copy the triggers.
-            for trig in self._topics[topic]:
-                dest["triggers"].append(copy.deepcopy(trig))
+            if copy:
+                dest["triggers"].extend(self._copy_trigger(trig) for trig in triggers)
+            else:
+                dest["triggers"].extend(triggers)
 
             # Inherits/Includes.
-            for label, mapping in {"inherits": self._lineage, "includes": self._includes}.items():
-                if topic in mapping and len(mapping[topic]):
-                    dest[label] = mapping[topic].copy()
+            for label, mapping in relations:
+                related = mapping.get(topic)
+                if related:
+                    dest[label] = related.copy() if copy else related
 
         return result
 
+    def _copy_trigger(self, trig):
+        """Copy a trigger's data for ``deparse()``.
+
+        Triggers only hold strings, ``None`` and lists of strings, so copying
+        the lists is as good as a ``deepcopy()`` and much cheaper.
+        """
+        return {
+            key: list(value) if type(value) is list else value
+            for key, value in trig.items()
+        }
+
     def write(self, fh, deparsed=None):
         """Write the currently parsed RiveScript data into a file.
 
-        Pass either a file name (string) or a file handle object.
+        Pass either a file name (string or path object) or a file handle
+        object.
 
         This uses ``deparse()`` to dump a representation of the loaded data and
         writes it to the destination file. If you provide your own data as the
@@ -364,38 +417,34 @@ class RiveScript(object):
         directly).
 
         Parameters:
-            fh (str or file): a string or a file-like object.
+            fh (str or file): a file name or a file-like object.
             deparsed (dict): a data structure in the same format as what
                 ``deparse()`` returns. If not passed, this value will come from
                 the current in-memory data from ``deparse()``.
         """
 
-        # Passed a string instead of a file handle?
-        if type(fh) is str:
-            fh = codecs.open(fh, "w", "utf-8")
-
-        # Deparse the loaded data.
+        # Deparse the loaded data. It's only read here, so don't copy it.
         if deparsed is None:
-            deparsed = self.deparse()
+            deparsed = self.deparse(copy=False)
+
+        # Build the whole document first and write it out in one go.
+        out = []
 
         # Start at the beginning.
-        fh.write("// Written by rivescript.deparse()\n")
-        fh.write("! version = 2.0\n\n")
+        out.append("// Written by rivescript.deparse()\n")
+        out.append("! version = 2.0\n\n")
 
         # Variables of all sorts!
-        for kind in ["global", "var", "sub", "person", "array"]:
-            if len(deparsed["begin"][kind].keys()) == 0:
+        for kind in ("global", "var", "sub", "person", "array"):
+            variables = deparsed["begin"][kind]
+            if not variables:
                 continue
 
-            for var in sorted(deparsed["begin"][kind].keys()):
+            for var in sorted(variables):
                 # Array types need to be separated by either spaces or pipes.
-                data = deparsed["begin"][kind][var]
-                if type(data) not in [str, text_type]:
-                    needs_pipes = False
-                    for test in data:
-                        if " " in test:
-                            needs_pipes = True
-                            break
+                data = variables[var]
+                if not isinstance(data, text_type):
+                    needs_pipes = any(" " in test for test in data)
 
                     # Word-wrap the result, target width is 78 chars minus the
                     # kind, var, and spaces and equals sign.
@@ -407,22 +456,18 @@ class RiveScript(object):
                     else:
                         data = " ".join(data)
 
-                fh.write("! {kind} {var} = {data}\n".format(
-                    kind=kind,
-                    var=var,
-                    data=data,
-                ))
-            fh.write("\n")
+                out.append("! {} {} = {}\n".format(kind, var, data))
+            out.append("\n")
 
         # Begin block.
-        if len(deparsed["begin"]["triggers"]):
-            fh.write("> begin\n\n")
-            self._write_triggers(fh, deparsed["begin"]["triggers"], indent="\t")
-            fh.write("< begin\n\n")
+        if deparsed["begin"]["triggers"]:
+            out.append("> begin\n\n")
+            self._write_triggers(out, deparsed["begin"]["triggers"], indent="\t")
+            out.append("< begin\n\n")
 
         # The topics. Random first!
         topics = ["random"]
-        topics.extend(sorted(deparsed["topics"].keys()))
+        topics.extend(sorted(deparsed["topics"]))
         done_random = False
         for topic in topics:
             if topic not in deparsed["topics"]: continue
@@ -435,49 +480,57 @@ class RiveScript(object):
 
             if topic != "random" or len(data["includes"]) or len(data["inherits"]):
                 tagged = True
-                fh.write("> topic " + topic)
+                out.append("> topic " + topic)
 
                 if data["inherits"]:
-                    fh.write(" inherits " + " ".join(sorted(data["inherits"].keys())))
+                    out.append(" inherits " + " ".join(sorted(data["inherits"])))
                 if data["includes"]:
-                    fh.write(" includes " + " ".join(sorted(data["includes"].keys())))
+                    out.append(" includes " + " ".join(sorted(data["includes"])))
 
-                fh.write("\n\n")
+                out.append("\n\n")
 
             indent = "\t" if tagged else ""
-            self._write_triggers(fh, data["triggers"], indent=indent)
+            self._write_triggers(out, data["triggers"], indent=indent)
 
             if tagged:
-                fh.write("< topic\n\n")
+                out.append("< topic\n\n")
+
+        # Passed a file name instead of a file handle? Then encode the
+        # document in one go and write the bytes straight out.
+        if hasattr(fh, "write"):
+            fh.write("".join(out))
+        else:
+            with io.open(fh, "wb") as outfh:
+                outfh.write("".join(out).encode("utf-8"))
 
         return True
 
-    def _write_triggers(self, fh, triggers, indent=""):
-        """Write triggers to a file handle.
+    def _write_triggers(self, out, triggers, indent=""):
+        """Write triggers to a list of output strings.
 
         Parameters:
-            fh (file): file object.
+            out (list): list to append the lines of RiveScript code to.
             triggers (list): list of triggers to write.
             indent (str): indentation for each line.
         """
 
         for trig in triggers:
-            fh.write(indent + "+ " + self._write_wrapped(trig["trigger"], indent=indent) + "\n")
+            out.append(indent + "+ " + self._write_wrapped(trig["trigger"], indent=indent) + "\n")
             d = trig
 
             if d.get("previous"):
-                fh.write(indent + "% " + self._write_wrapped(d["previous"], indent=indent) + "\n")
+                out.append(indent + "% " + self._write_wrapped(d["previous"], indent=indent) + "\n")
 
             for cond in d["condition"]:
-                fh.write(indent + "* " + self._write_wrapped(cond, indent=indent) + "\n")
+                out.append(indent + "* " + self._write_wrapped(cond, indent=indent) + "\n")
 
             if d.get("redirect"):
-                fh.write(indent + "@ " + self._write_wrapped(d["redirect"], indent=indent) + "\n")
+                out.append(indent + "@ " + self._write_wrapped(d["redirect"], indent=indent) + "\n")
 
             for reply in d["reply"]:
-                fh.write(indent + "- " + self._write_wrapped(reply, indent=indent) + "\n")
+                out.append(indent + "- " + self._write_wrapped(reply, indent=indent) + "\n")
 
-            fh.write("\n")
+            out.append("\n")
 
     def _write_wrapped(self, line, sep=" ", indent="", width=78):
         """Word-wrap a line of RiveScript code for being written to a file.
@@ -489,35 +542,96 @@ class RiveScript(object):
 
         :return str: The reformatted line(s)."""
 
-        words = line.split(sep)
-        lines = []
-        line  = ""
-        buf   = []
-
-        while len(words):
-            buf.append(words.pop(0))
-            line = sep.join(buf)
-            if len(line) > width:
-                # Need to word wrap!
-                words.insert(0, buf.pop())  # Undo
+        lines  = []
+        buf    = []
+        length = 0  # Length of sep.join(buf)
+
+        for word in line.split(sep):
+            if buf and length + len(sep) + len(word) > width:
+                # Need to word wrap! A word longer than the width gets a
+                # line of its own.
                 lines.append(sep.join(buf))
                 buf = []
-                line = ""
+                length = 0
+
+            if buf:
+                length += len(sep)
+            buf.append(word)
+            length += len(word)
 
         # Straggler?
-        if line:
-            lines.append(line)
+        if length or not lines:
+            lines.append(sep.join(buf))
 
         # Returned output
-        result = lines.pop(0)
-        if len(lines):
-            eol = ""
-            if sep == " ":
-                eol = "\\s"
-            for item in lines:
-                result += eol + "\n" + indent + "^ " + item
+        eol = "\\s" if sep == " " else ""
+        return (eol + "\n" + indent + "^ ").join(lines)
 
-        return result
+    # The fields saved by dump_binary().
+    _binary_fields = (
+        "_global", "_var", "_sub", "_person", "_array", "_includes",
+        "_lineage", "_topics", "_thats", "_sorted", "_syntax", "_regexc",
+        "_dirty_topics",
+    )
+
+    def dump_binary(self, fh):
+        """Save the loaded and sorted replies in a binary format.
+
+        This is a much faster way to save and restore a bot than ``write()``,
+        because ``load_binary()`` doesn't need to parse or sort anything. The
+        data is a pickle, so it can only be read back by the same version of
+        RiveScript, and it should only be loaded from a trusted source. Use
+        ``write()`` to save replies that people will read or edit.
+
+        Object macros aren't saved, since their code has already been loaded
+        into the language handlers.
+
+        Parameters:
+            fh (str or file): a file name or a file-like object opened in
+                binary mode.
+        """
+        data = {field: getattr(self, field) for field in self._binary_fields}
+        data["version"] = __version__
+
+        # Passed a file name instead of a file handle?
+        if hasattr(fh, "write"):
+            pickle.dump(data, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            with io.open(fh, "wb") as outfh:
+                pickle.dump(data, outfh, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_binary(self, fh):
+        """Load replies saved by ``dump_binary()``.
+
+        This replaces all the replies and bot variables currently loaded.
+        They're ready to use straight away; there's no need to call
+        ``sort_replies()``. Object macros are kept, but aren't restored.
+
+        Parameters:
+            fh (str or file): a file name or a file-like object opened in
+                binary mode.
+        """
+        # Passed a file name instead of a file handle?
+        if hasattr(fh, "read"):
+            data = pickle.load(fh)
+        else:
+            with io.open(fh, "rb") as infh:
+                data = pickle.load(infh)
+
+        if data.get("version") != __version__:
+            raise ValueError("Binary replies were saved by RiveScript {}, not {}".format(
+                data.get("version"), __version__
+            ))
+
+        for field in self._binary_fields:
+            setattr(self, field, data[field])
+        self._clear_topic_cache()
+
+        # Apply the special globals, as parsing them would.
+        if self._global.get("debug"):
+            self._debug = str(self._global["debug"]).lower() == "true"
+        if self._global.get("depth"):
+            self._depth = int(self._global["depth"])
 
     ############################################################################
     # Sorting Methods                                                          #
@@ -530,13 +644,21 @@ class RiveScript(object):
         to populate the various internal sort buffers. This is absolutely
         necessary for reply matching to work efficiently!
         """
-        # (Re)initialize the sort cache.
-        self._sorted["topics"] = {}
-        self._sorted["thats"]  = {}
+        # (Re)initialize the sort cache. Only the topics that reach a topic
+        # changed since the last sort need to be sorted again.
+        self._clear_topic_cache()
+        dirty = self._dirty_topics
+        self._dirty_topics = set()
+        sorted_topics = self._sorted.setdefault("topics", {})
+        sorted_thats  = self._sorted.setdefault("thats", {})
+        self._regexc["array"]  = {}
+        self._regexc["array_trigger"] = {}
         self._say("Sorting triggers...")
 
         # Loop through all the topics.
         for topic in self._topics.keys():
+            if topic in sorted_topics and dirty.isdisjoint(inherit_utils.get_topic_tree(self, topic)):
+                continue
             self._say("Analyzing topic " + topic)
 
             # Collect a list of all the triggers we're going to worry about.
@@ -545,19 +667,33 @@ class RiveScript(object):
             alltrig = inherit_utils.get_topic_triggers(self, topic, False)
 
             # Sort them.
-            self._sorted["topics"][topic] = sorting.sort_trigger_set(alltrig, True, self._say)
+            sorted_topics[topic] = sorting.sort_trigger_set(alltrig, True, self._say)
 
             # Get all of the %Previous triggers for this topic.
             that_triggers = inherit_utils.get_topic_triggers(self, topic, True)
 
             # And sort them, too.
-            self._sorted["thats"][topic] = sorting.sort_trigger_set(that_triggers, False, self._say)
+            sorted_thats[topic] = sorting.sort_trigger_set(that_triggers, False, self._say)
 
         # And sort the substitution lists.
         if not "lists" in self._sorted:
             self._sorted["lists"] = {}
-        self._sorted["lists"]["sub"] = sorting.sort_list(self._sub.keys())
-        self._sorted["lists"]["person"] = sorting.sort_list(self._person.keys())
+        for kind in ("sub", "person"):
+            patterns = sorting.sort_list(getattr(self, "_" + kind).keys())
+            self._sorted["lists"][kind] = patterns
+            self._regexc[kind] = utils.compile_substitutions(patterns)
+
+    def _clear_topic_cache(self):
+        """Forget the memoized topic inheritance lookups.
+
+        This must be called whenever ``_topics``, ``_thats``, ``_includes``,
+        ``_lineage`` or the sort buffers change.
+        """
+        self._topic_cache["triggers"] = {}
+        self._topic_cache["tree"]     = {}
+        self._topic_cache["previous"] = {}
+        self._topic_cache["index"]    = {}
+        self._topic_cache["weights"]  = {}
 
     ############################################################################
     # Public Configuration Methods                                             #
@@ -683,7 +819,6 @@ class RiveScript(object):
                 del self._sub[what]
         else:
             self._sub[what] = rep
-        self._precompile_substitution('sub', what)
 
     def set_person(self, what, rep):
         """Set a person substitution.
@@ -701,7 +836,6 @@ class RiveScript(object):
                 del self._person[what]
         else:
             self._person[what] = rep
-        self._precompile_substitution('person', what)
 
     def set_uservar(self, user, name, value):
         """Set a variable for a user.
@@ -766,7 +900,7 @@ class RiveScript(object):
 
                 self._session.set(uid, uservars)
 
-        elif type(user) in [text_type, str] and type(data) is dict:
+        elif isinstance(user, text_type) and type(data) is dict:
             # Setting variables for a single user.
             self._session.set(user, data)
 
@@ -901,7 +1035,7 @@ class RiveScript(object):
         def reply_matches(prev, lr):
             nonlocal user
             botside = self._brain.reply_regexp(user, prev)
-            if re.match(botside, lr):
+            if botside.match(lr):
                 return True
             return False
 
@@ -927,15 +1061,15 @@ class RiveScript(object):
                 for trigger, syntax in triggers.items():
                     append_if_match()
             else:
-                if trigger not in triggers:
+                syntax = triggers.get(trigger)
+                if syntax is None:
                     return response
-                syntax = triggers[trigger]
                 append_if_match()
         else:   # trigger is not None
             for topic, triggers in self._syntax.items():
-                if trigger not in triggers:
+                syntax = triggers.get(trigger)
+                if syntax is None:
                     continue
-                syntax = triggers[trigger]
                 append_if_match()
 
         return response
@@ -1009,13 +1143,12 @@ class RiveScript(object):
         handlers = self._handlers
         objlangs = self._objlangs
         subs = self._sub
-        subs_precompiled = self._regexc["sub"]
         persons = self._person
-        persons_precompiled = self._regexc["person"]
         array = self._array
         var = self._var
         self.__init__(debug=self._debug, strict=self._strict, depth=self._depth,
-                log=self._log, utf8=self._utf8, session_manager=self._session)
+                log=self._log, utf8=self._utf8, session_manager=self._session,
+                syntax_check=self._parser.syntax_check)
         if preserve_globals:
             self._global = global_vars
         if preserve_handlers:
@@ -1026,35 +1159,13 @@ class RiveScript(object):
             self._var = var
         if preserve_substitutions:
             self._sub = subs
-            self._regexc["sub"] = subs_precompiled
         if preserve_persons:
             self._person = persons
-            self._regexc["person"] = persons_precompiled
         if not preserve_uservars:
             self.clear_uservars()
         if preserve_arrays:
             self._array = array
 
-    def _precompile_substitution(self, kind, pattern):
-        """Pre-compile the regexp for a substitution pattern.
-
-        This will speed up the substitutions that happen at the beginning of
-        the reply fetching process. With the default brain, this took the
-        time for _substitute down from 0.08s to 0.02s
-
-        :param str kind: One of ``sub``, ``person``.
-        :param str pattern: The substitution pattern.
-        """
-        if pattern not in self._regexc[kind]:
-            qm = re.escape(pattern)
-            self._regexc[kind][pattern] = {
-                "qm": qm,
-                "sub1": re.compile(r'^' + qm + r'$'),
-                "sub2": re.compile(r'^' + qm + r'(\W+)'),
-                "sub3": re.compile(r'(\W+)' + qm + r'(\W+)'),
-                "sub4": re.compile(r'(\W+)' + qm + r'$'),
-            }
-
     def _precompile_regexp(self, trigger):
         """Precompile the regex for most triggers.
 
@@ -1064,7 +1175,10 @@ class RiveScript(object):
 
         :param str trigger: The trigger text to attempt to precompile.
         """
-        if utils.is_atomic(trigger):
+        if trigger in self._regexc["trigger"]:
+            return  # The same trigger was already seen in another topic.
+
+        if utils.literal_text(trigger) is not None:
             return  # Don't need a regexp for atomic triggers.
 
         # Check for dynamic tags.
@@ -1080,36 +1194,23 @@ class RiveScript(object):
 
     def _dump(self):
         """For debugging, dump the entire data structure."""
-        pp = pprint.PrettyPrinter(indent=4)
-
-        print("=== Variables ===")
-        print("-- Globals --")
-        pp.pprint(self._global)
-        print("-- Bot vars --")
-        pp.pprint(self._var)
-        print("-- Substitutions --")
-        pp.pprint(self._sub)
-        print("-- Person Substitutions --")
-        pp.pprint(self._person)
-        print("-- Arrays --")
-        pp.pprint(self._array)
-
-        print("=== Topic Structure ===")
-        pp.pprint(self._topics)
-        print("=== %Previous Structure ===")
-        pp.pprint(self._thats)
-
-        print("=== Includes ===")
-        pp.pprint(self._includes)
-
-        print("=== Inherits ===")
-        pp.pprint(self._lineage)
-
-        print("=== Sort Buffer ===")
-        pp.pprint(self._sorted)
-
-        print("=== Syntax Tree ===")
-        pp.pprint(self._syntax)
+        pp = pprint.PrettyPrinter(indent=4, compact=True)
+
+        for heading, data in (
+            ("=== Variables ===\n-- Globals --", self._global),
+            ("-- Bot vars --",                   self._var),
+            ("-- Substitutions --",              self._sub),
+            ("-- Person Substitutions --",       self._person),
+            ("-- Arrays --",                     self._array),
+            ("=== Topic Structure ===",          self._topics),
+            ("=== %Previous Structure ===",      self._thats),
+            ("=== Includes ===",                 self._includes),
+            ("=== Inherits ===",                 self._lineage),
+            ("=== Sort Buffer ===",              self._sorted),
+            ("=== Syntax Tree ===",              self._syntax),
+        ):
+            print(heading)
+            pp.pprint(data)
 
 ################################################################################
 # Interactive Mode                                                             #
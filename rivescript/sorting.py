@@ -8,57 +8,66 @@
 from __future__ import unicode_literals
 from .regexp import RE
 from . import utils
-import re
-from operator import attrgetter
+from functools import lru_cache
 import sys
 
 
-class TriggerObj(object):
-    """An object represent trigger for ease of sorting.
+@lru_cache(maxsize=8192)
+def pattern_sort_key(pattern):
+    """Get the part of a trigger's sort key that depends only on its text.
 
     In RiveScript sorting rule, some of sorting criteria are ascending for example alphabetical or inherit whereas other
-    criteria are descending order for example word counts. In Python multiple level sort, the sort direction set by
-    parameter `reverse` is applied to all criteria. So in our implementation, some parameters are set to negative to
-    keep search direction consistent among all criteria.
+    criteria are descending order for example word counts. Sort keys are compared in ascending order, so some values
+    are negated to keep the direction consistent among all criteria.
+
+    The weight and inherits level come first in the full key; see ``sort_trigger_set()``.
 
         Parameters:
-            pattern: Trigger pattern in string format i.e. "* hey [man]"
-            index: Unique positional index of the object in the original list
-            weight: Pattern weight ``{weight}``
-            inherit: Pattern inherit level, extracted from i.e. "{inherit=1}hi"
-
-        Computed:
-            wordcount: Negative length of pattern by wordcount
-            len: Negative length of pattern by character count
+            pattern: Trigger pattern in string format i.e. "* hey [man]", without its ``{inherits}`` tag
+
+        Returns a tuple of:
+            is_empty: Boolean variable indicating whether the trigger has zero wordcount, False < True
             star: Boolean - has wildcards (``*``), excluding alphabetical wildcards, and numeric wildcards
             pound: Boolean - has numeric wildcards (``#``)
             under: Boolean - has alphabetical wildcards (``_``)
             option: Boolean - has optional tags ("[man]" in "hey [man]"), assume that the template is properly formatted
-            is_empty: Boolean variable indicating whether the trigger has non-zero wordcount
+            wordcount: Negative length of pattern by wordcount, -2 < -1
+            len: Negative length of pattern by character count, -10 < -5
+            alphabet: The pattern itself, i.e. haha < hihi
         """
+    wordcount = utils.word_count(pattern)  # Use `utils` for counting choice of wildcards
+    return (
+        wordcount == 0,
+        '*' in pattern,
+        '#' in pattern,
+        '_' in pattern,
+        '[' in pattern,
+        -wordcount,
+        -len(pattern),
+        pattern,
+    )
+
+
+@lru_cache(maxsize=8192)
+def trigger_tags(trigger):
+    """Read the ``{weight}`` and ``{inherits}`` tags from a trigger.
+
+    The same trigger text is seen again each time the replies are sorted (and
+    once per topic that reaches it), so the results are memoized.
+
+    :param str trigger: The trigger text, possibly prefixed with an
+        ``{inherits}`` tag by ``get_topic_triggers()``.
+
+    :return tuple: The weight (``0`` if none), the inherits level
+        (``None`` if none) and the trigger text without its inherits tag.
+    """
+    match  = RE.weight.search(trigger)
+    weight = int(match.group(1)) if match else 0
 
-    def __init__(self, pattern, index, weight, inherit = sys.maxsize):
-        self.alphabet = pattern  # Sort according to alphabet order i.e. haha < hihi
-        self.index = index  # For rearrange items in the sorted array
-        self.weight = - weight  # Negative weight to place i.e. -100 < 0
-        self.inherit = inherit  # Low inherit takes precedence i.e. 0 < 1
-        self.wordcount = - utils.word_count(pattern)  # Length -2 < -1. Use `utils` for counting choice of wildcards
-        self.len    = -len(self.alphabet)  # Length -10 < -5
-        pattern_set = set(pattern)
-        self.star   = '*' in pattern_set  # Has wildcards 0 < 1
-        self.pound  = '#' in pattern_set  # Has numeric wildcards 0 < 1
-        self.under  = '_' in pattern_set  # Has alpha wildcards 0 < 1
-        self.option = '[' in pattern_set  # Has optionals 0 < 1
-        #self.star   = self.alphabet.count('*')  # Number of wildcards 0 < 1
-        #self.star   = self.alphabet.startswith('* ') + self.alphabet.count(' * ') + self.alphabet.endswith(' *') + \
-                #self.alphabet.startswith('[*] ') + self.alphabet.endswith(' [*]') + \
-                #(self.alphabet == '*') + (self.alphabet == '[*]')  # Number of wildcards 0 < 1
-        #self.pound  = self.alphabet.count('#')  # Number of numeric wildcards 0 < 1
-        #self.under  = self.alphabet.count('_')  # Number of alphabetical wildcards 0 < 1
-        #self.option = self.alphabet.count('[') + self.alphabet.count('(')  # Number of option 0 < 1
-        #self.option = self.alphabet.count('[') - self.alphabet.count('[*') + self.alphabet.count('(')  # Number of option 0 < 1
-        self.is_empty = self.wordcount == 0  # Triggers with words precede triggers with no words, False < True
-
+    match = RE.inherit.search(trigger)
+    if match is None:
+        return weight, None, trigger
+    return weight, int(match.group(1)), trigger[:match.start()] + trigger[match.end():]
 
 def sort_trigger_set(triggers, exclude_previous=True, say=None):
     """Sort a group of triggers in optimal sorting order.
@@ -88,6 +97,10 @@ def sort_trigger_set(triggers, exclude_previous=True, say=None):
         exclude_previous (bool): Create a sort buffer for 'previous' triggers.
         say (function): A reference to ``RiveScript._say()`` or provide your
             own function.
+
+    Returns:
+        tuple: The sorted triggers. It's a read-only sort buffer, so it's
+        returned as a tuple.
     """
     if say is None:
         say = lambda x: x
@@ -96,72 +109,37 @@ def sort_trigger_set(triggers, exclude_previous=True, say=None):
     # ["trigger text", pointer to trigger data]
     # So this code will use e.g. `trig[0]` when referring to the trigger text.
 
-    # Create a list of trigger objects map.
-    trigger_object_list = []
+    # Build a sort key for each trigger. The position in the original list
+    # comes last, so that ties keep their original order.
+    keys = []
     for index, trig in enumerate(triggers):
 
         if exclude_previous and trig[1]["previous"]:
             continue
 
-        pattern = trig[0]  # Extract only the text of the trigger, with possible tag of inherit
-
-        # See if it has a weight tag
-        match, weight = re.search(RE.weight, trig[0]), 0
-        if match:  # Value of math is not None if there is a match.
-            weight = int(match.group(1))  # Get the weight from the tag ``{weight}``
+        # Get the weight and inherits tags, and the text without the latter.
+        weight, inherit, pattern = trigger_tags(trig[0])
 
-        # See if it has an inherits tag.
-        match = re.search(RE.inherit, pattern)
-        if match:
-            inherit = int(match.group(1))  # Get inherit value from the tag ``{inherit}``
+        if inherit is not None:
             say("\t\t\tTrigger belongs to a topic which inherits other topics: level=" + str(inherit))
-            triggers[index][0] = pattern = re.sub(RE.inherit, "", pattern)  # Remove the inherit tag if any
+            trig[0] = pattern  # Remove the inherit tag
         else:
             inherit = sys.maxsize  # If not found any inherit, set it to the maximum value, to place it last in the sort
 
-        trigger_object_list.append(TriggerObj(pattern, index, weight, inherit))
+        # Priority order of sorting criteria:
+        # weight, inherit, is_empty, star, pound, under, option, wordcount, len, alphabet
+        keys.append((-weight, inherit) + pattern_sort_key(pattern) + (index,))
 
-    # Priority order of sorting criteria:
-    # weight, inherit, is_empty, star, pound, under, option, wordcount, len, alphabet
-    sorted_list = sorted(trigger_object_list,
-                         key=attrgetter('weight', 'inherit', 'is_empty', 'star', 'pound',
-                                        'under', 'option', 'wordcount', 'len', 'alphabet'))
-    return [triggers[item.index] for item in sorted_list]
+    keys.sort()
+    return tuple([triggers[key[-1]] for key in keys])
 
 def sort_list(items):
-    """Sort a simple list by number of words and length."""
-
-    # Track by number of words.
-    track = {}
-
-    def by_length(word1, word2):
-        return len(word2) - len(word1)
-
-    # Loop through each item.
-    for item in items:
-        # Count the words.
-        cword = utils.word_count(item, all=True)
-        if cword not in track:
-            track[cword] = []
-        track[cword].append(item)
-
-    # Sort them.
-    output = []
-    for count in sorted(track.keys(), reverse=True):
-        sort = sorted(track[count], key=len, reverse=True)
-        output.extend(sort)
-
-    return output
-
-def init_sort_track():
-    """Returns a new dict for keeping track of triggers for sorting."""
-    return {
-        'atomic': {},  # Sort by number of whole words
-        'option': {},  # Sort optionals by number of words
-        'alpha':  {},  # Sort alpha wildcards by no. of words
-        'number': {},  # Sort number wildcards by no. of words
-        'wild':   {},  # Sort wildcards by no. of words
-        'pound':  [],  # Triggers of just #
-        'under':  [],  # Triggers of just _
-        'star':   []   # Triggers of just *
-    }
+    """Sort a simple list by number of words and length, into a tuple."""
+
+    # Most words first, then the longest first. Python's sort is stable, so
+    # items that tie keep their original order.
+    return tuple(sorted(items, key=_list_sort_key))
+
+def _list_sort_key(item):
+    """Get the sort key for an item of ``sort_list()``."""
+    return -utils.word_count(item, all=True), -len(item)
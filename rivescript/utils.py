@@ -7,10 +7,13 @@
 
 from __future__ import unicode_literals
 from .regexp import RE
+from functools import lru_cache
+from operator import methodcaller
 import random
 import re
 import string
 
+@lru_cache(maxsize=8192)
 def word_count(trigger, all=False):
     """Count the words that aren't wildcards or options in a trigger.
 
@@ -18,19 +21,15 @@ def word_count(trigger, all=False):
     :param bool all: Count purely based on whitespace separators, or
         consider wildcards not to be their own words.
 
-    :return int: The word count."""
-    words = []
-    if all:
-        words = re.split(RE.ws, trigger)
-    else:
-        words = re.split(RE.wilds_and_optionals, trigger)
+    :return int: The word count.
 
-    wc = 0  # Word count
-    for word in words:
-        if len(word) > 0:
-            wc += 1
+    Results are memoized per trigger. The cache is bounded, and shared by
+    every bot in the process."""
+    if all:
+        return len(RE.word.findall(trigger))
+    return len(RE.plain_word.findall(trigger))
 
-    return wc
+_special = frozenset('*#_([<{@')
 
 def is_atomic(trigger):
     """Determine if a trigger is atomic or not.
@@ -48,17 +47,83 @@ def is_atomic(trigger):
     # Atomic triggers don't contain any wildcards or parenthesis or anything
     # of the sort. We don't need to test the full character set, just left
     # brackets will do.
-    special = ['*', '#', '_', '(', '[', '<', '{', '@']
-    for char in special:
-        if char in trigger:
-            return False
+    return _special.isdisjoint(trigger)
+
+@lru_cache(maxsize=8192)
+def literal_text(trigger):
+    """Get the plain text a trigger matches, if it only matches one string.
+
+    Atomic triggers match only their own text. A trigger whose only special
+    part is a ``{weight}`` tag also compiles down to a regexp for one exact
+    string, so it can be compared verbatim too.
+
+    :param str trigger: The trigger to test.
+
+    :return str: The text the trigger matches, or ``None`` if it needs the
+        regular expression engine.
+
+    Results are memoized per trigger in a bounded cache, since this is
+    checked for every trigger as it is loaded and sorted.
+    """
+    if is_atomic(trigger):
+        return trigger
+    if '{weight=' in trigger:
+        literal = RE.weight.sub('', trigger)
+        if is_atomic(literal):
+            return literal
+    return None
+
+def compile_substitutions(patterns):
+    """Compile the regexps used to apply a list of substitution patterns.
+
+    A pattern only matches as a whole word or phrase. The patterns must be
+    applied one at a time in priority order (see ``sorting.sort_list()``), so
+    each gets its own regexp. One more regexp finds any of them, to skip the
+    whole list for messages that none of them are in.
+
+    :param list patterns: The substitution patterns, sorted by priority.
+
+    :return tuple: The regexp for any pattern, and a tuple of
+        ``(pattern, regexp)`` pairs in priority order; or ``None`` if there
+        are no patterns.
+    """
+    if not patterns:
+        return None
+    escaped = [re.escape(pattern) for pattern in patterns]
+    return (
+        re.compile(r'(?<!\w)(?:' + '|'.join(escaped) + r')(?!\w)'),
+        tuple(
+            (pattern, re.compile(r'(?<!\w)' + qm + r'(?!\w)'))
+            for pattern, qm in zip(patterns, escaped)
+        ),
+    )
+
+class _NastiesTable(dict):
+    """``str.translate()`` table that deletes all but ASCII letters, digits and spaces.
+
+    Code points are looked up lazily. Only ASCII ones are remembered, so
+    the table can't grow without bound on arbitrary Unicode input.
+    """
+    KEEP = frozenset(string.ascii_letters + string.digits + " ")
+
+    def __missing__(self, code):
+        keep = code if chr(code) in self.KEEP else None
+        if code < 128:
+            self[code] = keep
+        return keep
 
-    return True
+_nasties_table = _NastiesTable()
 
 def strip_nasties(s):
     """Formats a string for ASCII regex matching."""
-    s = re.sub(RE.nasties, '', s)
-    return s
+    return s.translate(_nasties_table)
+
+_formatters = {
+    "uppercase": methodcaller("upper"),
+    "lowercase": methodcaller("lower"),
+    "sentence":  methodcaller("capitalize"),
+    "formal":    string.capwords,
+}
 
 def string_format(msg, method):
     """Format a string (upper, lower, formal, sentence).
@@ -69,14 +134,10 @@ def string_format(msg, method):
 
     :return str: The reformatted string.
     """
-    if method == "uppercase":
-        return msg.upper()
-    elif method == "lowercase":
-        return msg.lower()
-    elif method == "sentence":
-        return msg.capitalize()
-    elif method == "formal":
-        return string.capwords(msg)
+    formatter = _formatters.get(method)
+    if formatter is None:
+        return msg
+    return formatter(msg)
 
 def random_choice(bucket):
     """Safely get a random choice from a list.
@@ -93,3 +154,17 @@ def random_choice(bucket):
     if len(bucket) == 0:
         return ""
     return random.choice(bucket)
+
+def weighted_choice(bucket, weights):
+    """Safely get a weighted random choice from a list.
+
+    Parameters:
+        bucket (list): A list to randomly choose from.
+        weights (list): The relative weight of each item in ``bucket``.
+
+    Returns:
+        str: The random choice. Blank string if the list was empty.
+    """
+    if len(bucket) == 0:
+        return ""
+    return random.choices(bucket, weights=weights)[0]
@@ -3,7 +3,9 @@
 
 from __future__ import unicode_literals, absolute_import
 from six.moves import cStringIO as StringIO
+from io import BytesIO
 
+from rivescript import RiveScript
 from .config import RiveScriptTestCase
 
 class DeparseTests(RiveScriptTestCase):
@@ -158,6 +160,12 @@ class DeparseTests(RiveScriptTestCase):
         self.new(source)
         dep = self.rs.deparse()
         self.assertEqual(dep, expected)
+        self.assertEqual(self.rs.deparse(copy=False), expected)
+
+        # Editing a copy mustn't touch the bot's own replies.
+        dep["topics"]["a"]["triggers"][0]["reply"].append("Changed.")
+        dep["begin"]["var"]["name"] = "Changed"
+        self.assertEqual(self.rs.deparse(), expected)
 
         # See if the re-written RiveScript source matches the original.
         buf = StringIO()
@@ -165,3 +173,68 @@ class DeparseTests(RiveScriptTestCase):
         written = buf.getvalue().split("\n")
         for i, line in enumerate(source.split("\n")):
             assert line.strip() == written[i].strip()
+
+    def test_write_wrapped(self):
+        long_word = "x" * 100
+        self.new("""
+            + tell me something long
+            - """ + long_word + """ and then some more words to make this reply wrap onto a second line.
+        """)
+
+        buf = StringIO()
+        self.rs.write(buf)
+        written = buf.getvalue().split("\n")
+        self.assertIn("- " + long_word + "\\s", written)
+
+        # The written code should load back to the same reply.
+        self.new(buf.getvalue())
+        self.reply("Tell me something long", long_word +
+            " and then some more words to make this reply wrap onto a second line.")
+
+    def test_dump_binary(self):
+        self.new("""
+            ! var name = Aiden
+            ! sub what's = what is
+            ! sub who's = who is
+
+            + what is your name
+            - My name is <bot name>.
+
+            + knock knock
+            - Who's there?
+
+            + *
+            % who is there
+            - <sentence> who?
+
+            > topic a inherits b
+                + a
+                - A.
+            < topic
+
+            > topic b
+                + b
+                - B.
+            < topic
+        """)
+        buf = BytesIO()
+        self.rs.dump_binary(buf)
+
+        self.rs = RiveScript()
+        buf.seek(0)
+        self.rs.load_binary(buf)
+        self.reply("What's your name?", "My name is Aiden.")
+        self.reply("Knock knock", "Who's there?")
+        self.reply("Banana", "Banana who?")
+        self.rs.set_uservar(self.username, "topic", "a")
+        self.reply("B", "B.")
+
+        # Code streamed in afterwards is sorted in with the rest.
+        self.extend("""
+            > topic b
+                + c
+                - C.
+            < topic
+        """)
+        self.reply("C", "C.")
+        self.reply("A", "A.")
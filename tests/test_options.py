@@ -3,6 +3,9 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import contextlib
+import io
+
 from .config import RiveScriptTestCase
 
 class ParserOptionTest(RiveScriptTestCase):
@@ -74,3 +77,31 @@ class ParserOptionTest(RiveScriptTestCase):
         self.reply("test concatin trigger", "Helloworld!")
         self.reply("test concat in trigger with space and optional", "Hello world!")
         self.reply("test concat space in trigger", "Hello world!")
+
+    def test_syntax_check_disabled(self):
+        code = """
+            + what are you, robot
+            - I am a robot.
+
+            + hello bot
+            - Hello human.
+        """
+        self.assertRaises(Exception, self.new, code)
+
+        # Without the syntax check the bad line loads as written and the
+        # rest of the file still parses.
+        self.new(code, syntax_check=False)
+        self.reply("Hello bot", "Hello human.")
+
+    def test_debug_global_reaches_parser(self):
+        self.new("""
+            ! global debug = true
+        """)
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            self.extend("""
+                + hello bot
+                - Hello human.
+            """)
+        self.assertIn("Trigger pattern: hello bot", out.getvalue())
@@ -3,6 +3,9 @@
 
 from __future__ import unicode_literals, absolute_import
 
+import random
+from unittest import mock
+
 from .config import RiveScriptTestCase
 
 class ReplyTests(RiveScriptTestCase):
@@ -117,3 +120,25 @@ class ReplyTests(RiveScriptTestCase):
         self.reply("My name is Bob.", "I thought your name was Alice?")
         self.reply("What is my name?", "Your name is Bob, right?")
         self.reply("HTML Test", "This has some non-RS <em>tags</em> in it.")
+
+    def test_weighted_replies(self):
+        self.new("""
+            + hello
+            - Hi!{weight=1000}
+            - Hey!{weight=0}
+
+            + goodbye
+            - Bye!{weight=5}
+        """)
+        for _ in range(20):
+            self.assertIn(self.rs.reply(self.username, "hello"), ["Hi!", "Hey!"])
+            self.reply("goodbye", "Bye!")
+
+        # The {weight} tags are passed on to random.choices(). A weight of 0
+        # isn't allowed, and counts as 1.
+        with mock.patch.object(random, "choices", wraps=random.choices) as choices:
+            self.rs.reply(self.username, "hello")
+        choices.assert_called_once_with(["Hi!{weight=1000}", "Hey!{weight=0}"], weights=[1000, 1])
+
+        with mock.patch.object(random, "choices", return_value=["Hey!{weight=0}"]):
+            self.reply("hello", "Hey!")
@@ -76,6 +76,42 @@ class SessionTests(RiveScriptTestCase):
         self.rs.thaw_uservars(self.username, "discard")
         self.reply("Who am I?", "Aren't you Bob?")
 
+    def test_freeze_thaw_copies(self):
+        """Test that frozen variables don't share state with live ones."""
+        self.new(self.common_session_test)
+        self.rs.set_uservar(self.username, "tags", ["a", "b"])
+        self.reply("My name is Aiden", "Nice to meet you, Aiden.")
+        self.rs.freeze_uservars(self.username)
+
+        self.rs.get_uservar(self.username, "tags").append("c")
+        self.reply("My name is Bob", "Nice to meet you, Bob.")
+
+        self.rs.thaw_uservars(self.username)
+        self.assertEqual(self.rs.get_uservar(self.username, "tags"), ["a", "b"])
+        self.reply("What did I just say?", "You just said: my name is aiden")
+
+        # Exported variables are copies too.
+        exported = self.rs.get_uservars(self.username)
+        exported["__history__"]["input"][0] = "changed"
+        exported["tags"].append("d")
+        self.reply("What did I just say?", "You just said: what did i just say")
+        self.assertEqual(self.rs.get_uservar(self.username, "tags"), ["a", "b"])
+
+    def test_history_not_changed_in_place(self):
+        """Test that replies don't modify a user's old history."""
+        self.new(self.common_session_test)
+        self.rs.set_uservars(self.username, {"__history__": {
+            "input": ("hello",) * 9,
+            "reply": ("hi",) * 9,
+        }})
+        self.reply("What did I just say?", "You just said: hello")
+
+        history = self.rs.get_uservar(self.username, "__history__")
+        inputs  = history["input"]
+        self.reply("What did you just say?", "I just said: You just said: hello")
+        self.assertEqual(inputs[0], "what did i just say")
+        self.assertEqual(len(inputs), 9)
+
     def test_lastmatch(self):
         """Test the bug __lastmatch__ return u"undefined" is solved"""
         self.new("""
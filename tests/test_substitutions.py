@@ -3,6 +3,7 @@
 
 from __future__ import unicode_literals, absolute_import
 
+from rivescript.exceptions import RS_ERR_MATCH
 from .config import RiveScriptTestCase
 
 class SubstitutionTests(RiveScriptTestCase):
@@ -42,3 +43,38 @@ class SubstitutionTests(RiveScriptTestCase):
         """)
         self.reply("say I am cool", "you are cool")
         self.reply("say You are dumb", "I am dumb")
+
+    def test_substitutions_not_repeated(self):
+        self.new("""
+            ! sub i'm   = i am
+            ! sub i am  = you are
+            ! sub wanna = want to
+
+            + * want to *
+            - Why do <star1> want to <star2>?
+
+            + i am i am i am
+            - Stuck.
+        """)
+        self.reply("I'm I'm I'm", "Stuck.")
+        self.reply("I wanna wanna go", "Why do i want to want to go?")
+        self.assertEqual(self.rs._brain.substitute("i am", "sub"), "you are")
+
+        self.rs.set_substitution("wanna", None)
+        self.rs.sort_replies()
+        self.reply("I wanna go", RS_ERR_MATCH)
+
+    def test_substitution_priority(self):
+        # The substitution with more words wins, even when a lower priority
+        # one starts earlier in the message and overlaps it.
+        self.new("""
+            ! sub b c d = x
+            ! sub a b   = y
+
+            + *
+            - <star>
+        """)
+        self.reply("a b c d", "a x")
+        self.reply("hello a b c d!", "hello a x")
+        self.reply("a b", "y")
+        self.assertEqual(self.rs._brain.substitute("hello a b c d!", "sub"), "hello a x!")
@@ -123,3 +123,102 @@ class TopicTest(RiveScriptTestCase):
         self.reply("Name a Red Hat distro.", RS_ERR_MATCH)
         self.reply("Name a Debian distro.", RS_ERR_MATCH)
         self.reply("Say stuff.", RS_ERR_MATCH)
+
+    def test_topic_inheritence_reload(self):
+        self.new("""
+            > topic colors
+                + what color is the sky
+                - Blue.
+            < topic
+
+            > topic stuff includes colors
+                + say stuff
+                - Stuff.
+            < topic
+        """)
+        self.rs.set_uservar(self.username, "topic", "stuff")
+        self.reply("What color is the sky?", "Blue.")
+        self.reply("Name a Debian distro.", RS_ERR_MATCH)
+
+        # Including another topic later must not reuse the old inheritance.
+        self.extend("""
+            > topic linux
+                + name a debian distro
+                - Ubuntu.
+            < topic
+
+            > topic stuff includes linux
+            < topic
+        """)
+        self.reply("What color is the sky?", "Blue.")
+        self.reply("Name a Debian distro.", "Ubuntu.")
+
+    def test_topic_inheritence_resort(self):
+        self.new("""
+            > topic colors
+                + what color is the sky
+                - Blue.
+            < topic
+
+            > topic stuff includes colors
+                + say stuff
+                - Stuff.
+            < topic
+
+            > topic other
+                + say other stuff
+                - Other stuff.
+            < topic
+        """)
+        other = self.rs._sorted["topics"]["other"]
+
+        # Adding to an included topic re-sorts the topics that reach it.
+        self.extend("""
+            > topic colors
+                + what color is grass
+                - Green.
+            < topic
+        """)
+        self.assertIs(self.rs._sorted["topics"]["other"], other)
+
+        self.rs.set_uservar(self.username, "topic", "stuff")
+        self.reply("What color is grass?", "Green.")
+        self.reply("What color is the sky?", "Blue.")
+        self.reply("Say stuff", "Stuff.")
+
+    def test_topic_inheritence_diamond(self):
+        self.new("""
+            > topic base
+                + hello
+                - Hello from base.
+
+                + *
+                - Base catch-all.
+            < topic
+
+            > topic left inherits base
+                + left
+                - Left.
+            < topic
+
+            > topic right inherits base
+                + right
+                - Right.
+            < topic
+
+            > topic top inherits left right
+                + top
+                - Top.
+            < topic
+        """)
+
+        # The base topic is reached twice but its triggers are sorted once.
+        triggers = [trig[0] for trig in self.rs._sorted["topics"]["top"]]
+        self.assertEqual(len(triggers), len(set(triggers)))
+
+        self.rs.set_uservar(self.username, "topic", "top")
+        self.reply("Top", "Top.")
+        self.reply("Left", "Left.")
+        self.reply("Right", "Right.")
+        self.reply("Hello", "Hello from base.")
+        self.reply("Anything", "Base catch-all.")
@@ -120,6 +120,17 @@ class TriggerTests(RiveScriptTestCase):
         """)
         self.reply("What color is my white shirt?", "Your shirt is white.")
 
+    def test_trigger_arrays_with_escaped_spaces(self):
+        self.new("""
+            ! array desserts = ice\\scream apple\\spie cake
+
+            + i like (@desserts)
+            - Me too, <star> is great.
+        """)
+        self.assertEqual(self.rs._array["desserts"], ["ice cream", "apple pie", "cake"])
+        self.reply("I like ice cream", "Me too, ice cream is great.")
+        self.reply("I like apple pie", "Me too, apple pie is great.")
+
     def test_nested_arrays(self):
         self.new("""
             ! array primary = red green blue
@@ -178,8 +189,56 @@ class TriggerTests(RiveScriptTestCase):
 
             + hello *{weight=20}
             - Hi there!
+
+            + hello bot {weight=30}
+            - Hello human.
         """)
+        self.reply("Hello bot", "Hello human.")
         self.reply("Hello robot.", "Hi there!")
         self.reply("Hello or something", "Hi there!")
         self.reply("Can you run a Google search for Python", "Sure!")
         self.reply("Can you run a Google search for Python or something", "Or something. Sure!")
+
+    def test_atomic_trigger_priority(self):
+        self.new("""
+            + hello *
+            - Wildcard.
+
+            + hello bot
+            - Atomic.
+
+            + * bot{weight=5}
+            - Weighted wildcard.
+        """)
+        self.reply("Hello bot", "Weighted wildcard.")
+        self.reply("Hello robot", "Wildcard.")
+
+        self.new("""
+            + hello *
+            - Wildcard.
+
+            + hello bot
+            - Atomic.
+
+            + good bye{weight=5}
+            - Weighted.
+        """)
+        self.reply("Hello bot", "Atomic.")
+        self.reply("Good bye", "Weighted.")
+
+    def test_array_trigger_cache(self):
+        self.new("""
+            ! array colors = red blue
+
+            + i like (@colors)
+            - Me too.
+        """)
+        self.reply("I like red", "Me too.")
+        self.assertIn("i like (@colors)", self.rs._regexc["array_trigger"])
+
+        self.extend("""
+            ! array colors = green
+        """)
+        self.assertEqual(self.rs._regexc["array_trigger"], {})
+        self.reply("I like green", "Me too.")
+        self.reply("I like red", RS_ERR_MATCH)